@@ -1,4 +1,15 @@
 
 
+import os
+import sys
+
+# Modules in agents/ and tools/ import config, core, agents and tools as
+# top-level names. main.py puts the project directory on sys.path; this (and
+# the same check in tools/__init__.py) covers every other way in: python -m,
+# or an import from another working directory.
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_DIR not in sys.path:
+    sys.path.insert(0, _PROJECT_DIR)
+
 __all__: list[str] = []
 
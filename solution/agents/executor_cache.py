@@ -0,0 +1,53 @@
+import functools
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+
+# Each cache here keeps at most this many entries, dropping the least
+# recently used one first.
+AGENT_CACHE_SIZE = 32
+
+
+def cache_get(cache: "OrderedDict[Hashable, Any]", key: Hashable) -> Optional[Any]:
+    """The cached entry for ``key`` (marked most recently used), or None."""
+    entry = cache.get(key)
+    if entry is not None:
+        cache.move_to_end(key)
+    return entry
+
+
+def cache_put(cache: "OrderedDict[Hashable, Any]", key: Hashable, entry: Any) -> None:
+    """Store ``entry`` under ``key``, evicting the oldest entries past AGENT_CACHE_SIZE."""
+    cache[key] = entry
+    cache.move_to_end(key)
+    while len(cache) > AGENT_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+# (id(llm), tool names, system prompt) -> (llm, compiled ReAct graph).
+# The llm is kept alongside so its id cannot be recycled while cached, and
+# a hit only counts if it is the very same llm object.
+_REACT_AGENTS: "OrderedDict[Tuple[int, Tuple[str, ...], str], Tuple[Any, Any]]" = OrderedDict()
+
+
+@functools.lru_cache(maxsize=None)
+def get_system_message(prompt: str):
+    """One shared SystemMessage per system prompt; messages are never mutated."""
+    from langchain_core.messages import SystemMessage
+    
+    return SystemMessage(content=prompt)
+
+
+def get_react_agent(llm, tools: List[Any], prompt: str):
+    """
+    Return the compiled ReAct executor for this llm/tools/prompt combination,
+    building it with create_react_agent only the first time it is asked for.
+    """
+    key = (id(llm), tuple(t.name for t in tools), prompt)
+    cached = cache_get(_REACT_AGENTS, key)
+    if cached is None or cached[0] is not llm:
+        from langgraph.prebuilt import create_react_agent
+        
+        cached = (llm, create_react_agent(model=llm, tools=tools, prompt=get_system_message(prompt)))
+        cache_put(_REACT_AGENTS, key, cached)
+    return cached[1]
@@ -1,15 +1,21 @@
 
 
+import functools
+import hashlib
 import json
 import re
 import time
-from typing import Any, Dict, Optional
-
-from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import HumanMessage
+from collections import OrderedDict
+from contextlib import aclosing
+from dataclasses import replace
+from typing import Any, Dict, Optional, Tuple
 
+from agents.executor_cache import cache_get, cache_put, get_react_agent
+from core.context import resolve
 from core.shared_memory import SharedMemory, FixPlan
-from core.message_logger import MessageLogger
+from core.json_utils import dumps_indented, find_object, loads_object
+from core.message_logger import MessageLogger, truncate
+from core.incremental_json import IncrementalJsonParser
 
 
 FIX_SYSTEM_PROMPT = """You are a senior software architect for safe, minimal code fixes.
@@ -25,44 +31,52 @@ Principles:
 Output: one JSON object with description, steps[], safety_considerations[], expected_outcome."""
 
 
-def parse_fix_output(output: str) -> Optional[FixPlan]:
+FIX_TASK_DESCRIPTION = """Based on the RCA analysis, generate a detailed fix plan.
+
+    RCA input:
+    {rca_context}
+
+    Your task:
+    - Reflect the RCA's root cause.
+    - Propose the smallest viable change set to fix it.
+    - Include safety/edge-case considerations and testing notes.
+    - Return one JSON object: description, steps[], safety_considerations[], expected_outcome."""
+
+
+_FIX_DESCRIPTION_RE = re.compile(r'(?:Description|description)[:\s]+(.+?)(?:\n|$)')
+
+# Finished run results keyed by a fingerprint of the agent's inputs, so a
+# replayed run on unchanged inputs skips the LLM entirely.
+# The stored section is kept next to the result so a replay can set a
+# copy of it rather than rebuild it from the result's dict. Bounded to
+# AGENT_CACHE_SIZE entries, least recently used evicted first.
+_AGENT_CACHE: "OrderedDict[str, Tuple[Dict[str, Any], FixPlan]]" = OrderedDict()
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_fix_output(output: str) -> Optional[FixPlan]:
     
     try:
        
-        json_match = re.search(r'\{[^{}]*"description"[^{}]*\}', output, re.DOTALL)
-        if not json_match:
-            json_match = re.search(r'\{[\s\S]*?"steps"[\s\S]*?\][\s\S]*?\}', output)
-        
-        if json_match:
-            json_str = json_match.group()
-            
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-              
-                start_idx = output.find('{"description"')
-                if start_idx == -1:
-                    start_idx = output.find('{\n    "description"')
-                if start_idx == -1:
-                    start_idx = output.find('{\n  "description"')
-                
-                if start_idx != -1:
-                    brace_count = 0
-                    end_idx = start_idx
-                    for i, char in enumerate(output[start_idx:], start_idx):
-                        if char == '{':
-                            brace_count += 1
-                        elif char == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                end_idx = i + 1
-                                break
-                    
-                    json_str = output[start_idx:end_idx]
-                    data = json.loads(json_str)
-                else:
-                    raise json.JSONDecodeError("No valid JSON found", output, 0)
+        data = loads_object(output, "description")
+        # Brace-free replies go straight to the plain-text fallback below
+        if data is None and "{" in output:
+            has_description = '"description"' in output
+            has_steps = '"steps"' in output
+            # Decode outward from the "description" key; find_object steps
+            # back one "{" at a time (str.rfind) past any nested object before
+            # the key, and the C decoder finds where each candidate ends
+            if has_description:
+                data = find_object(output, "description")
+            if data is None and has_steps:
+                data = find_object(output, "steps")
             
+            # The reply has a plan object that does not decode; the plain-text
+            # fallback is only for replies without one
+            if data is None and (has_description or has_steps):
+                raise json.JSONDecodeError("No valid JSON found", output, 0)
+        
+        if data is not None:
             return FixPlan(
                 description=data.get("description", ""),
                 steps=data.get("steps", []),
@@ -71,7 +85,7 @@ def parse_fix_output(output: str) -> Optional[FixPlan]:
             )
         
    
-        description_match = re.search(r'(?:Description|description)[:\s]+(.+?)(?:\n|$)', output)
+        description_match = _FIX_DESCRIPTION_RE.search(output)
         
         if description_match:
             return FixPlan(
@@ -88,58 +102,89 @@ def parse_fix_output(output: str) -> Optional[FixPlan]:
         return None
 
 
-def create_fix_agent_node(
-    llm,
-    logger: MessageLogger,
-    shared_memory: SharedMemory
-):
-   
-    
+def parse_fix_output(output: str) -> Optional[FixPlan]:
+    """Memoized on the raw output; each call gets its own copy to stamp and store."""
+    fix_plan = _parse_fix_output(output)
+    return replace(fix_plan) if fix_plan else None
 
-    rca_dict = shared_memory.get_rca_dict()
-    rca_context = json.dumps(rca_dict, indent=2) if rca_dict else "No RCA data available"
-    
-    
-    task_description = f"""Based on the RCA analysis, generate a detailed fix plan.
 
-    RCA input:
-    {rca_context}
+def _chunk_text(content: Any) -> str:
+    """Flatten a streamed message chunk's content (str or list of parts) to text."""
+    if isinstance(content, str):
+        return content
+    return "".join(part if isinstance(part, str) else part.get("text", "") for part in content)
 
-    Your task:
-    - Reflect the RCA's root cause.
-    - Propose the smallest viable change set to fix it.
-    - Include safety/edge-case considerations and testing notes.
-    - Return one JSON object: description, steps[], safety_considerations[], expected_outcome."""
+
+def _task_message(rca_context: str):
+    """The task prompt for an RCA. Built per call: the graph stamps an id onto
+    each message it is handed, so one instance must not be appended twice."""
+    from langchain_core.messages import HumanMessage
     
-   
-    agent_executor = create_react_agent(
-        model=llm,
-        tools=[],  
-        prompt=FIX_SYSTEM_PROMPT,
-    )
+    return HumanMessage(content=FIX_TASK_DESCRIPTION.format(rca_context=rca_context))
+
+
+def create_fix_agent_node(
+    llm,
+    logger: Optional[MessageLogger] = None,
+    shared_memory: Optional[SharedMemory] = None,
+    rca_dict: Optional[Dict[str, Any]] = None
+):
+    # logger / shared_memory may be left out when the node runs under
+    # core.context.bind(); a binding takes precedence over them.
+    # rca_dict: the RCA the caller already fetched, if any; the node then
+    # neither looks it up in shared memory nor re-serializes it per call.
+    from langchain_core.messages import AIMessage
+
+    default_logger, default_memory = logger, shared_memory
+    rca_json = dumps_indented(rca_dict) if rca_dict is not None else None
+    agent_executor = get_react_agent(llm, [], FIX_SYSTEM_PROMPT)
     
-    def fix_node(state: dict) -> dict:
+    async def fix_node(state: dict) -> dict:
         """Execute Fix agent and log everything."""
+        logger, shared_memory = resolve(default_logger, default_memory)
         
-       
-        rca_context = shared_memory.get_context_for_agent("fix_agent")
+        has_rca = rca_dict is not None or shared_memory.get_rca_dict() is not None
         logger.log_agent_start("Fix_Suggestion_Agent", {
             "task": "Generate Fix Plan",
-            "context": {"has_rca": rca_context.get("rca") is not None},
+            "context": {"has_rca": has_rca},
             "tools": []
         })
         
+        # Without an RCA the model has nothing to plan from; don't spend a call on it
+        if not has_rca:
+            if logger.enabled_for("INFO"):
+                logger.log_agent_end("Fix_Suggestion_Agent", {
+                    "output": "Skipped: no RCA available",
+                    "success": False,
+                    "duration_ms": 0
+                })
+            return {"messages": [], "fix_plan": None}
+        
         start_time = time.time()
         
        
         current_messages = state.get("messages", [])
-        if not current_messages or "fix plan" not in str(current_messages[-1]).lower():
-            current_messages.append(HumanMessage(content=task_description))
+        last_content = getattr(current_messages[-1], "content", "") if current_messages else ""
+        if not isinstance(last_content, str):
+            last_content = str(last_content)
+        if not last_content or "fix plan" not in last_content.casefold():
+            rca_context = rca_json or shared_memory.get_rca_json_indented() or "No RCA data available"
+            current_messages.append(_task_message(rca_context))
             state["messages"] = current_messages
         
         
+        # The Fix agent has no tools, so its only LLM turn is the answer:
+        # stop reading as soon as the fix plan object closes and skip any
+        # trailing prose. Models without token streaming emit the whole
+        # AIMessage in one go (AIMessageChunk is a subclass of AIMessage).
+        parser = IncrementalJsonParser(required_key="description")
         try:
-            result = agent_executor.invoke(state)
+            async with aclosing(agent_executor.astream(state, stream_mode="messages")) as stream:
+                async for chunk, _ in stream:
+                    if isinstance(chunk, AIMessage):
+                        parser.feed(_chunk_text(chunk.content))
+                        if parser.complete():
+                            break
         except Exception as e:
             logger.log_error("Fix_Suggestion_Agent", type(e).__name__, str(e))
             raise
@@ -147,20 +192,22 @@ def create_fix_agent_node(
         duration_ms = int((time.time() - start_time) * 1000)
         
        
-        final_content = result["messages"][-1].content if result.get("messages") else ""
-        fix_plan = parse_fix_output(str(final_content))
+        content_str = parser.text()
+        result = {"messages": [*current_messages, AIMessage(content=content_str)]}
+        fix_plan = parse_fix_output(content_str)
         
         if fix_plan:
           
             shared_memory.set_fix_plan(fix_plan)
-            logger.log_memory_update("Fix_Suggestion_Agent", "fix_plan", fix_plan.to_dict())
+            logger.log_memory_update("Fix_Suggestion_Agent", "fix_plan", shared_memory.get_fix_plan_dict())
         
        
-        logger.log_agent_end("Fix_Suggestion_Agent", {
-            "output": str(final_content)[:500] + ("..." if len(str(final_content)) > 500 else ""),
-            "success": fix_plan is not None,
-            "duration_ms": duration_ms
-        })
+        if logger.enabled_for("INFO"):
+            logger.log_agent_end("Fix_Suggestion_Agent", {
+                "output": truncate(content_str),
+                "success": fix_plan is not None,
+                "duration_ms": duration_ms
+            })
         
       
         return {
@@ -177,12 +224,25 @@ async def run_fix_agent(
     shared_memory: SharedMemory
 ) -> Dict[str, Any]:
     
-    node = create_fix_agent_node(llm, logger, shared_memory)
+    rca_dict = shared_memory.get_rca_dict()
+    cache_key = hashlib.blake2b(json.dumps([
+        getattr(llm, "model_name", None) or getattr(llm, "model", None),
+        {k: v for k, v in (rca_dict or {}).items() if k != "timestamp"},
+    ], sort_keys=True, default=str).encode()).hexdigest()
+    
+    entry = cache_get(_AGENT_CACHE, cache_key)
+    if entry is not None:
+        cached, section = entry
+        shared_memory.set_fix_plan(replace(section))
+        logger.log_system("Fix_Suggestion_Agent result reused from cache")
+        return {**cached, "parsed": shared_memory.get_fix_plan_dict()}
+    
+    node = create_fix_agent_node(llm, logger, shared_memory, rca_dict=rca_dict)
     
   
     initial_state = {
         "messages": [],
-        "rca": shared_memory.get_rca_dict(),
+        "rca": rca_dict,
         "fix_plan": None,
         "patch_metadata": None,
         "trace_path": "",
@@ -190,12 +250,16 @@ async def run_fix_agent(
         "output_dir": ""
     }
     
-    result_state = node(initial_state)
+    result_state = await node(initial_state)
     
     fix_dict = shared_memory.get_fix_plan_dict()
     
-    return {
+    result = {
         "output": str(result_state.get("messages", [])[-1].content if result_state.get("messages") else ""),
         "parsed": fix_dict,
         "success": fix_dict is not None
     }
+    if result["success"]:
+        cache_put(_AGENT_CACHE, cache_key, (result, shared_memory.get_fix_plan()))
+    
+    return result
@@ -12,19 +12,20 @@ This agent is responsible for:
 Migrated to use LangGraph's create_react_agent for reliable tool calling.
 """
 
+import functools
+import hashlib
 import json
-import re
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Dict, Optional, Tuple
 from pathlib import Path
 
-from langgraph.prebuilt import create_react_agent
-from langchain_core.messages import HumanMessage
-
+from agents.executor_cache import cache_get, cache_put, get_react_agent
+from core.context import resolve
 from core.shared_memory import SharedMemory, PatchMetadata
-from core.message_logger import MessageLogger, EventType
-from tools.file_tools import read_file, write_file
-from tools.terminal_tools import run_terminal_command
+from core.json_utils import dumps_indented, find_object, loads_object
+from core.message_logger import MessageLogger, EventType, truncate
 
 
 PATCH_SYSTEM_PROMPT = """You are an expert code-generation specialist focused on precise, minimal patches.
@@ -43,49 +44,56 @@ Guidelines:
 - Return patch metadata as a JSON object: original_file, patched_file, changes_made (list), lines_modified (list)."""
 
 
-def parse_patch_output(output: str) -> Optional[PatchMetadata]:
-    """
-    Parse the Patch agent's output to extract structured metadata.
+PATCH_TASK_DESCRIPTION = """Generate a patched version of the buggy file based on the following analysis.
+
+## RCA Analysis:
+{rca_context}
+
+## Fix Plan:
+{fix_context}
+
+Your task:
+- Read the original source file: {affected_file} (start with `read_file`).
+- Focus on the bug area (around line {affected_line}) and apply the planned fix.
+- Write the full corrected file using `write_file`. Prefer `{patched_filename_hint}` unless the plan specifies another name.
+- Provide patch metadata JSON with original_file, patched_file, changes_made, lines_modified.
+
+Write the ENTIRE corrected file content, not just a diff."""
+
+
+# Finished run results keyed by a fingerprint of the agent's inputs, so a
+# replayed run on unchanged inputs skips the LLM entirely.
+# The stored section is kept next to the result so a replay can set a
+# copy of it rather than rebuild it from the result's dict. Bounded to
+# AGENT_CACHE_SIZE entries, least recently used evicted first.
+_AGENT_CACHE: "OrderedDict[str, Tuple[Dict[str, Any], PatchMetadata]]" = OrderedDict()
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_patch_output(output: str) -> Optional[PatchMetadata]:
+    # Patch metadata only comes as JSON; nothing to decode in brace-free replies
+    if "{" not in output:
+        return None
     
-    Args:
-        output: Raw output string from the Patch agent
-        
-    Returns:
-        PatchMetadata object if parsing succeeds, None otherwise
-    """
     try:
         
-        json_match = re.search(r'\{[^{}]*"original_file"[^{}]*\}', output, re.DOTALL)
-        if not json_match:
-            json_match = re.search(r'\{[\s\S]*?"changes_made"[\s\S]*?\][\s\S]*?\}', output)
+        data = loads_object(output, "original_file")
         
-        if json_match:
-            json_str = json_match.group()
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-              
-                start_idx = output.find('{"original_file"')
-                if start_idx == -1:
-                    start_idx = output.find('{\n    "original_file"')
-                
-                if start_idx != -1:
-                    brace_count = 0
-                    end_idx = start_idx
-                    for i, char in enumerate(output[start_idx:], start_idx):
-                        if char == '{':
-                            brace_count += 1
-                        elif char == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                end_idx = i + 1
-                                break
-                    
-                    json_str = output[start_idx:end_idx]
-                    data = json.loads(json_str)
-                else:
-                    raise json.JSONDecodeError("No valid JSON found", output, 0)
+        if data is None:
+            has_original_file = '"original_file"' in output
+            has_changes = '"changes_made"' in output
+            # Decode outward from the key with the C decoder, which copes with
+            # nested objects and braces inside string values
+            if has_original_file:
+                data = find_object(output, "original_file")
+            if data is None and has_changes:
+                data = find_object(output, "changes_made")
             
+            # The reply has a metadata object that does not decode
+            if data is None and (has_original_file or has_changes):
+                raise json.JSONDecodeError("No valid JSON found", output, 0)
+        
+        if data is not None:
             return PatchMetadata(
                 original_file=data.get("original_file", ""),
                 patched_file=data.get("patched_file", ""),
@@ -100,74 +108,109 @@ def parse_patch_output(output: str) -> Optional[PatchMetadata]:
         return None
 
 
-def create_patch_agent_node(
-    llm,
-    logger: MessageLogger,
-    shared_memory: SharedMemory,
-    output_dir: str
-):
-    
-    
-    
-    rca_dict = shared_memory.get_rca_dict()
-    fix_dict = shared_memory.get_fix_plan_dict()
-    
-    rca_context = json.dumps(rca_dict, indent=2) if rca_dict else "No RCA data available"
-    fix_context = json.dumps(fix_dict, indent=2) if fix_dict else "No fix plan available"
+def parse_patch_output(output: str) -> Optional[PatchMetadata]:
+    """
+    Parse the Patch agent's output to extract structured metadata.
     
+    Args:
+        output: Raw output string from the Patch agent
+        
+    Returns:
+        PatchMetadata object if parsing succeeds, None otherwise.
+        Parses are memoized on the raw output; each call gets its own copy.
+    """
+    patch_metadata = _parse_patch_output(output)
+    return replace(patch_metadata) if patch_metadata else None
+
+
+def _task_message(rca_context: str, fix_context: str, affected_file: str, affected_line: int):
+    from langchain_core.messages import HumanMessage
     
-    affected_file = rca_dict.get("affected_file", "unknown") if rca_dict else "unknown"
-    affected_line = rca_dict.get("affected_line", 0) if rca_dict else 0
     patched_filename_hint = f"fixed_{Path(affected_file).name}" if affected_file not in ("", "unknown", None) else "fixed_patch.py"
-    
-    task_description = f"""Generate a patched version of the buggy file based on the following analysis.
+    return HumanMessage(content=PATCH_TASK_DESCRIPTION.format(
+        rca_context=rca_context,
+        fix_context=fix_context,
+        affected_file=affected_file,
+        affected_line=affected_line,
+        patched_filename_hint=patched_filename_hint
+    ))
 
-## RCA Analysis:
-{rca_context}
-
-## Fix Plan:
-{fix_context}
 
-Your task:
-- Read the original source file: {affected_file} (start with `read_file`).
-- Focus on the bug area (around line {affected_line}) and apply the planned fix.
-- Write the full corrected file using `write_file`. Prefer `{patched_filename_hint}` unless the plan specifies another name.
-- Provide patch metadata JSON with original_file, patched_file, changes_made, lines_modified.
-
-Write the ENTIRE corrected file content, not just a diff."""
-    
+def create_patch_agent_node(
+    llm,
+    logger: Optional[MessageLogger] = None,
+    shared_memory: Optional[SharedMemory] = None,
+    output_dir: str = "",
+    rca_dict: Optional[Dict[str, Any]] = None,
+    fix_plan_dict: Optional[Dict[str, Any]] = None
+):
+    # logger / shared_memory may be left out when the node runs under
+    # core.context.bind(); a binding takes precedence over them.
+    # rca_dict / fix_plan_dict: upstream results the caller already fetched,
+    # if any; the node then neither looks them up in shared memory nor
+    # re-serializes them per call.
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+    from tools.file_tools import read_file, write_file
+    from tools.terminal_tools import run_terminal_command
     
-    agent_executor = create_react_agent(
-        model=llm,
-        tools=[read_file, write_file, run_terminal_command],
-        prompt=PATCH_SYSTEM_PROMPT,
-    )
+    default_logger, default_memory = logger, shared_memory
+    agent_executor = get_react_agent(llm, [read_file, write_file, run_terminal_command], PATCH_SYSTEM_PROMPT)
+    rca_json = dumps_indented(rca_dict) if rca_dict is not None else None
+    fix_plan_json = dumps_indented(fix_plan_dict) if fix_plan_dict is not None else None
     
-    def patch_node(state: dict) -> dict:
+    async def patch_node(state: dict) -> dict:
         """Execute Patch agent and log everything."""
+        logger, shared_memory = resolve(default_logger, default_memory)
         
-       
-        patch_context = shared_memory.get_context_for_agent("patch_agent")
+        rca = rca_dict if rca_dict is not None else shared_memory.get_rca_dict()
+        has_rca = rca is not None
+        has_fix_plan = fix_plan_dict is not None or shared_memory.get_fix_plan_dict() is not None
         logger.log_agent_start("Patch_Generation_Agent", {
             "task": "Generate Code Patch",
             "context": {
-                "has_rca": patch_context.get("rca") is not None,
-                "has_fix_plan": patch_context.get("fix_plan") is not None
+                "has_rca": has_rca,
+                "has_fix_plan": has_fix_plan
             },
             "tools": ["read_file", "write_file"]
         })
         
+        if not (has_rca and has_fix_plan):
+            if logger.enabled_for("INFO"):
+                logger.log_agent_end("Patch_Generation_Agent", {
+                    "output": "Skipped: RCA or fix plan missing",
+                    "success": False,
+                    "duration_ms": 0
+                })
+            return {"messages": [], "patch_metadata": None}
+        
         start_time = time.time()
         
+        affected_file = rca.get("affected_file", "unknown")
         
         current_messages = state.get("messages", [])
-        if not current_messages or "patch" not in str(current_messages[-1]).lower():
-            current_messages.append(HumanMessage(content=task_description))
+        last_content = getattr(current_messages[-1], "content", "") if current_messages else ""
+        if not isinstance(last_content, str):
+            last_content = str(last_content)
+        if not last_content or "patch" not in last_content.casefold():
+            current_messages.append(_task_message(
+                rca_json or shared_memory.get_rca_json_indented() or "No RCA data available",
+                fix_plan_json or shared_memory.get_fix_plan_json_indented() or "No fix plan available",
+                affected_file,
+                rca.get("affected_line", 0)
+            ))
+
+            # The orchestrator may have read the affected file while the Fix
+            # agent was running; hand it over so the agent can skip that turn.
+            prefetched = state.get("prefetched_file")
+            if prefetched:
+                current_messages.append(HumanMessage(
+                    content=f"Original source of {affected_file} (already loaded with `read_file`, no need to read it again):\n\n{prefetched}"
+                ))
             state["messages"] = current_messages
         
        
         try:
-            result = agent_executor.invoke(state)
+            result = await agent_executor.ainvoke(state)
         except Exception as e:
             logger.log_error("Patch_Generation_Agent", type(e).__name__, str(e))
             raise
@@ -175,45 +218,45 @@ Write the ENTIRE corrected file content, not just a diff."""
         duration_ms = int((time.time() - start_time) * 1000)
         
         
+        # Only messages produced by this run; the state's earlier ones were
+        # logged by the agents that created them.
+        prior_messages = set(map(id, current_messages))
+        tool_events = []
         for msg in result.get("messages", []):
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
+            if id(msg) in prior_messages:
+                continue
+            if isinstance(msg, AIMessage) and msg.tool_calls:
                 for tool_call in msg.tool_calls:
-                    logger.log_event(
-                        agent_name="Patch_Generation_Agent",
-                        event_type=EventType.TOOL_CALL,
-                        data={
-                            "tool_name": tool_call["name"],
-                            "arguments": tool_call["args"]
-                        }
-                    )
-            
-            
-            if hasattr(msg, "type") and msg.type == "tool":
-                logger.log_event(
-                    agent_name="Patch_Generation_Agent",
-                    event_type=EventType.TOOL_RESULT,
-                    data={
-                        "tool_name": msg.name,
-                        "result": str(msg.content)[:2000],
-                        "result_truncated": len(str(msg.content)) > 2000
-                    }
-                )
+                    tool_events.append((EventType.TOOL_CALL, {
+                        "tool_name": tool_call["name"],
+                        "arguments": tool_call["args"]
+                    }))
+            elif isinstance(msg, ToolMessage):
+                tool_result = str(msg.content)
+                tool_events.append((EventType.TOOL_RESULT, {
+                    "tool_name": msg.name,
+                    "result": tool_result[:2000],
+                    "result_truncated": len(tool_result) > 2000
+                }))
+        logger.log_events_bulk("Patch_Generation_Agent", tool_events)
         
         
         final_content = result["messages"][-1].content if result.get("messages") else ""
-        patch_metadata = parse_patch_output(str(final_content))
+        content_str = final_content if isinstance(final_content, str) else str(final_content)
+        patch_metadata = parse_patch_output(content_str)
         
         if patch_metadata:
             
             shared_memory.set_patch_metadata(patch_metadata)
-            logger.log_memory_update("Patch_Generation_Agent", "patch_metadata", patch_metadata.to_dict())
+            logger.log_memory_update("Patch_Generation_Agent", "patch_metadata", shared_memory.get_patch_metadata_dict())
         
         
-        logger.log_agent_end("Patch_Generation_Agent", {
-            "output": str(final_content)[:500] + ("..." if len(str(final_content)) > 500 else ""),
-            "success": patch_metadata is not None,
-            "duration_ms": duration_ms
-        })
+        if logger.enabled_for("INFO"):
+            logger.log_agent_end("Patch_Generation_Agent", {
+                "output": truncate(content_str),
+                "success": patch_metadata is not None,
+                "duration_ms": duration_ms
+            })
         
        
         return {
@@ -245,25 +288,52 @@ async def run_patch_agent(
         Dictionary with the agent's output and parsed results
     """
     
-    node = create_patch_agent_node(llm, logger, shared_memory, output_dir)
+    rca_dict = shared_memory.get_rca_dict()
+    fix_plan_dict = shared_memory.get_fix_plan_dict()
+    cache_key = hashlib.blake2b(json.dumps([
+        getattr(llm, "model_name", None) or getattr(llm, "model", None),
+        {k: v for k, v in (rca_dict or {}).items() if k != "timestamp"},
+        {k: v for k, v in (fix_plan_dict or {}).items() if k != "timestamp"},
+    ], sort_keys=True, default=str).encode()).hexdigest()
+    
+    # A cached result is only reusable while the patched file it wrote is still there
+    entry = cache_get(_AGENT_CACHE, cache_key)
+    if entry is not None:
+        cached, section = entry
+        patched_file = Path(cached["parsed"].get("patched_file") or "")
+        if not patched_file.is_absolute():
+            patched_file = Path(output_dir) / patched_file
+        if patched_file.is_file():
+            shared_memory.set_patch_metadata(replace(section))
+            logger.log_system("Patch_Generation_Agent result reused from cache", {"patched_file": str(patched_file)})
+            return {**cached, "parsed": shared_memory.get_patch_metadata_dict()}
+    
+    node = create_patch_agent_node(
+        llm, logger, shared_memory, output_dir,
+        rca_dict=rca_dict, fix_plan_dict=fix_plan_dict
+    )
     
    
     initial_state = {
         "messages": [],
-        "rca": shared_memory.get_rca_dict(),
-        "fix_plan": shared_memory.get_fix_plan_dict(),
+        "rca": rca_dict,
+        "fix_plan": fix_plan_dict,
         "patch_metadata": None,
         "trace_path": "",
         "codebase_path": "",
         "output_dir": output_dir
     }
     
-    result_state = node(initial_state)
+    result_state = await node(initial_state)
     
     patch_dict = shared_memory.get_patch_metadata_dict()
     
-    return {
+    result = {
         "output": str(result_state.get("messages", [])[-1].content if result_state.get("messages") else ""),
         "parsed": patch_dict,
         "success": patch_dict is not None
     }
+    if result["success"]:
+        cache_put(_AGENT_CACHE, cache_key, (result, shared_memory.get_patch_metadata()))
+    
+    return result
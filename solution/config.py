@@ -1,27 +1,46 @@
 
+import functools
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-
-
-load_dotenv()
+from typing import Dict, Optional
 
 
 BASE_DIR = Path(__file__).parent
 PROJECT_ROOT = BASE_DIR.parent
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
-
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "auto").lower()
 
+@functools.cache
+def load_env() -> None:
+    """Load .env into os.environ, once, the first time a setting needs it."""
+    from dotenv import load_dotenv
+    load_dotenv()
 
-GOOGLE_MODEL = os.getenv("GOOGLE_MODEL", "gemini-2.5-flash")
-GROQ_MODEL = os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905")
 
-
-LLM_MODEL = GOOGLE_MODEL if LLM_PROVIDER == "google" else GROQ_MODEL
+@functools.cache
+def _env_settings() -> Dict[str, Optional[str]]:
+    load_env()
+    
+    provider = os.getenv("LLM_PROVIDER", "auto").lower()
+    google_model = os.getenv("GOOGLE_MODEL", "gemini-2.5-flash")
+    groq_model = os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905")
+    
+    return {
+        "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY"),
+        "GROQ_API_KEY": os.getenv("GROQ_API_KEY"),
+        "LLM_PROVIDER": provider,
+        "GOOGLE_MODEL": google_model,
+        "GROQ_MODEL": groq_model,
+        "LLM_MODEL": google_model if provider == "google" else groq_model,
+    }
+
+
+def __getattr__(name: str):
+    # GOOGLE_API_KEY, LLM_PROVIDER, ... are resolved on first access so that
+    # importing config does not touch .env.
+    settings = _env_settings()
+    if name in settings:
+        return settings[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 CODEBASE_PATH = PROJECT_ROOT / "fastapi-project"
 ERROR_TRACE_PATH = PROJECT_ROOT / "trace_1.json"
@@ -32,7 +51,7 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 
 
 MAX_FILE_SIZE_BYTES = 1_000_000  
-ALLOWED_READ_EXTENSIONS = {".py", ".txt", ".json", ".md", ".html", ".yml", ".yaml", ".ini", ".cfg", ".toml"}
+ALLOWED_READ_EXTENSIONS = frozenset({".py", ".txt", ".json", ".md", ".html", ".yml", ".yaml", ".ini", ".cfg", ".toml"})
 
 
 LOG_LEVEL = "INFO"
@@ -40,8 +59,9 @@ LOG_LEVEL = "INFO"
 def validate_config():
     """Validate that required configuration is present."""
     errors = []
+    settings = _env_settings()
     
-    if not GOOGLE_API_KEY and not GROQ_API_KEY:
+    if not settings["GOOGLE_API_KEY"] and not settings["GROQ_API_KEY"]:
         errors.append("Either GOOGLE_API_KEY or GROQ_API_KEY must be set in environment")
     
     if not CODEBASE_PATH.exists():
@@ -0,0 +1,11 @@
+
+
+from datetime import datetime, timezone
+
+
+def utc_iso(timestamp_ns: int) -> str:
+    """Format a ``time.time_ns()`` reading like ``datetime.utcnow().isoformat()``."""
+    seconds, nanos = divmod(timestamp_ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(
+        microsecond=nanos // 1000, tzinfo=None
+    ).isoformat()
@@ -0,0 +1,44 @@
+
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple
+
+from .message_logger import MessageLogger
+from .shared_memory import SharedMemory
+
+
+# The logger / shared memory of the pipeline run the current task belongs to.
+# asyncio tasks copy the context they are created in, so concurrent runs that
+# each bind their own pair never see each other's state.
+_current_logger: ContextVar[MessageLogger] = ContextVar("message_logger")
+_current_memory: ContextVar[SharedMemory] = ContextVar("shared_memory")
+
+
+@contextmanager
+def bind(logger: MessageLogger, shared_memory: SharedMemory) -> Iterator[None]:
+    """Make ``logger`` and ``shared_memory`` current for the enclosed block."""
+    logger_token = _current_logger.set(logger)
+    memory_token = _current_memory.set(shared_memory)
+    try:
+        yield
+    finally:
+        _current_memory.reset(memory_token)
+        _current_logger.reset(logger_token)
+
+
+def resolve(
+    logger: Optional[MessageLogger] = None,
+    shared_memory: Optional[SharedMemory] = None
+) -> Tuple[MessageLogger, SharedMemory]:
+    """
+    The bound logger and shared memory, falling back to the given defaults.
+
+    Raises:
+        LookupError: if neither a binding nor a default is available
+    """
+    logger = _current_logger.get(logger)
+    shared_memory = _current_memory.get(shared_memory)
+    if logger is None or shared_memory is None:
+        raise LookupError("No MessageLogger/SharedMemory bound; use core.context.bind() or pass them explicitly")
+    return logger, shared_memory
@@ -0,0 +1,88 @@
+
+
+import json
+from typing import Any, Dict, List, Optional
+
+from .json_utils import loads
+
+
+class IncrementalJsonParser:
+    """
+    Spots the first complete JSON object in a stream of text chunks.
+
+    String, escape and brace-depth state is carried across ``feed`` calls, so
+    each character is scanned exactly once no matter how the text is chunked.
+    Braces in surrounding prose are tolerated: a balanced candidate that does
+    not decode to a dict (or lacks ``required_key``) is discarded and scanning
+    carries on.
+    """
+
+    def __init__(self, required_key: Optional[str] = None):
+        self._required_key = required_key
+        self._parts: List[str] = []
+        self._length = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start = -1
+        self._result: Optional[Dict[str, Any]] = None
+
+    def feed(self, chunk: str) -> None:
+        """Append a chunk of text and advance the scanner over it."""
+        if not chunk:
+            return
+
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        if self._result is not None:
+            return
+
+        for i, char in enumerate(chunk):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = offset + i
+                self._depth += 1
+            elif self._depth == 0:
+                continue
+            elif char == '"':
+                self._in_string = True
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._accept(offset + i + 1):
+                    return
+
+    def _accept(self, end: int) -> bool:
+        """Decode the balanced candidate ending at ``end``; keep it if it qualifies."""
+        candidate = self.text()[self._start:end]
+        try:
+            obj = loads(candidate)
+        except json.JSONDecodeError:
+            return False
+        if not isinstance(obj, dict):
+            return False
+        if self._required_key is not None and self._required_key not in obj:
+            return False
+        self._result = obj
+        return True
+
+    def complete(self) -> bool:
+        """True once a qualifying top-level object has been closed."""
+        return self._result is not None
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """The decoded object, or None if none has completed yet."""
+        return self._result
+
+    def text(self) -> str:
+        """All text fed so far."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
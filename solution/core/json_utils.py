@@ -0,0 +1,97 @@
+
+
+import dataclasses
+import json
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_DECODER = json.JSONDecoder()
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON with orjson when available, else the stdlib."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(obj: Any) -> Any:
+    # stdlib counterpart of orjson's native dataclass support. A shallow
+    # field mapping is enough: the encoder calls back here for nested
+    # dataclasses, so asdict()'s recursive deep copy would be wasted.
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {name: getattr(obj, name) for name in obj.__dataclass_fields__}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Encode to UTF-8 JSON bytes, optionally 2-space indented.
+
+    Dataclass instances are encoded as their fields (natively by orjson).
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def dumps_line(obj: Any) -> bytes:
+    """Encode to one line of compact JSON bytes ending in a newline (ND-JSON)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return dumps(obj) + b"\n"
+
+
+def dumps_indented(obj: Any) -> str:
+    """Encode to 2-space indented JSON text."""
+    return dumps(obj, indent=True).decode("utf-8")
+
+
+def loads_object(output: str, required_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Happy path for agent replies that are nothing but one JSON object.
+
+    Returns the object if the whole (stripped) output decodes to a dict that
+    has ``required_key``; otherwise None, so callers fall back to extraction.
+    """
+    stripped = output.strip()
+    if not stripped.startswith("{"):
+        return None
+    try:
+        data = loads(stripped)
+    except ValueError:
+        return None
+    if isinstance(data, dict) and required_key in data:
+        return data
+    return None
+
+
+def find_object(text: str, required_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Pull the JSON object holding ``required_key`` out of surrounding prose.
+
+    For each ``"required_key"`` occurrence, decodes from the nearest ``{``
+    before it, moving out one ``{`` at a time while that lands on a nested
+    object (or a brace in a string) instead of the key's own; the C scanner
+    finds where each candidate ends, so there is no regex backtracking.
+    Returns None if no such object decodes.
+    """
+    needle = f'"{required_key}"'
+    idx = text.find(needle)
+    while idx != -1:
+        start = text.rfind("{", 0, idx)
+        while start != -1:
+            try:
+                obj, _ = _DECODER.raw_decode(text, start)
+            except ValueError:
+                obj = None
+            if isinstance(obj, dict) and required_key in obj:
+                return obj
+            start = text.rfind("{", 0, start)
+        idx = text.find(needle, idx + len(needle))
+    return None
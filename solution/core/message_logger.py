@@ -1,13 +1,20 @@
 
-import json
+import itertools
+import logging
+import os
+import queue
+import time
 import uuid
+import weakref
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Tuple, Union
 from enum import Enum
 import threading
 
+from .clock import utc_iso
+from .json_utils import dumps, dumps_line, loads
+
 
 class EventType(str, Enum):
    
@@ -22,38 +29,194 @@ class EventType(str, Enum):
     SYSTEM = "system"
 
 
-@dataclass
-class LogEvent:
-   
-    event_id: int
-    timestamp: str
-    agent_name: str
-    event_type: str
-    iteration: int
-    data: Dict[str, Any] = field(default_factory=dict)
-    
-    def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+# Events are recorded at INFO except errors; a logger below an event's
+# level drops it.
+_EVENT_LEVELS: Dict[str, int] = {EventType.ERROR: logging.ERROR}
+
+
+# Tells the writer thread to exit
+_STOP = object()
+
+# How often a waiting flush() checks that the writer thread is still alive
+_FLUSH_POLL_SECONDS = 0.5
+
+
+def _write_events(
+    events_queue: "queue.SimpleQueue",
+    events: List[Dict[str, Any]],
+    lock: threading.Lock,
+    errors: List[Exception],
+    stream_fd: Optional[int] = None
+) -> None:
+    """
+    Writer thread body: move queued events into ``events``, numbering them in
+    queue order. A queued threading.Event is a flush marker and is set once
+    everything queued before it has been stored.
+
+    With ``stream_fd`` events are instead appended to that file as ND-JSON,
+    one write per batch, and not kept; queued bytes are written as they are.
+    The thread closes the file when it stops.
+
+    An item that fails to store does not stop the thread: its exception is
+    appended to ``errors`` (for the next flush to raise) and draining goes on.
+
+    Takes the logger's parts rather than the logger so that an unreferenced
+    logger can be collected (its finalizer then stops this thread).
+    """
+    event_ids = itertools.count(1)
+    try:
+        while True:
+            item = events_queue.get()
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            try:
+                if isinstance(item, bytes):
+                    os.write(stream_fd, item)
+                    continue
+                batch = item if isinstance(item, list) else (item,)
+                for event in batch:
+                    event["event_id"] = next(event_ids)
+                if stream_fd is None:
+                    with lock:
+                        events.extend(batch)
+                    continue
+                for event in batch:
+                    event["timestamp"] = utc_iso(event["timestamp"])
+                try:
+                    payload = b"".join(map(dumps_line, batch))
+                except (TypeError, ValueError):
+                    # Only the events that cannot be encoded are dropped;
+                    # the rest of the batch is still written
+                    lines = []
+                    for event in batch:
+                        try:
+                            lines.append(dumps_line(event))
+                        except (TypeError, ValueError) as e:
+                            with lock:
+                                errors.append(e)
+                    payload = b"".join(lines)
+                os.write(stream_fd, payload)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+    finally:
+        if stream_fd is not None:
+            os.close(stream_fd)
+        # Whatever stopped the thread, nobody may be left waiting on a flush
+        while True:
+            try:
+                item = events_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+
+
+def truncate(text: str, limit: int = 500, marker: str = "...") -> str:
+    """``text`` cut to ``limit`` characters plus ``marker``; returned as-is when it fits."""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + marker
+
+
+def _agents_involved(events: List[Dict[str, Any]]) -> List[str]:
+    return list(set(e["agent_name"] for e in events if e["agent_name"] != "system"))
+
+
+def to_single_json(stream_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Read an ND-JSON stream written by ``MessageLogger(stream_path=...)`` back
+    into the structure ``MessageLogger.get_full_log`` returns.
+
+    The first line is the session header and a saved stream ends with a
+    footer; every other line is one event. ``end_time`` is None for a stream
+    that was never saved (e.g. after a crash).
+    """
+    header: Dict[str, Any] = {}
+    end_time = None
+    events = []
+    with open(stream_path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = loads(line)
+            if "event_id" in record:
+                events.append(record)
+            elif "end_time" in record:
+                end_time = record["end_time"]
+            else:
+                header = record
+    return {
+        "session_id": header.get("session_id"),
+        "start_time": header.get("start_time"),
+        "end_time": end_time,
+        "total_events": len(events),
+        "agents_involved": _agents_involved(events),
+        "events": events
+    }
 
 
 class MessageLogger:
     """
     Thread-safe message logger for capturing all agent interactions.
     
+    Logging calls only build the event and put it on a queue; a background
+    thread numbers and stores events, so producers never wait on each other.
+    Readers flush the queue first, so they see every event logged before them.
+    
+    Given a ``stream_path``, events are appended to that file as ND-JSON as
+    they are logged instead of being held in memory; readers then read the
+    file back (see ``to_single_json``).
     """
     
-    def __init__(self, session_id: Optional[str] = None):
-        self._lock = threading.RLock()
+    def __init__(
+        self,
+        session_id: Optional[str] = None,
+        level: str = "INFO",
+        stream_path: Optional[str] = None
+    ):
+        self._lock = threading.Lock()
         self._session_id = session_id or str(uuid.uuid4())[:8]
+        self._level = logging.getLevelName(level.upper())
+        if not isinstance(self._level, int):
+            raise ValueError(f"Unknown log level: {level}")
         self._start_time = datetime.utcnow().isoformat()
-        self._events: List[LogEvent] = []
-        self._event_counter = 0
+        # Events are stored in their final dict form and shared by snapshots.
+        # Timestamps are taken as time_ns() and formatted to ISO strings in
+        # place the first time a snapshot covers them; _formatted_upto marks
+        # how far that has got, and after it events are never mutated.
+        self._events: List[Dict[str, Any]] = []
+        self._formatted_upto = 0
         self._current_iterations: Dict[str, int] = {}
+        # Agents pass the same tool schema list on every turn; remember the
+        # names extracted from the last one
+        self._last_tools: Optional[List[Dict[str, Any]]] = None
+        self._last_tool_names: List[str] = []
+        self._stream_path = Path(stream_path) if stream_path else None
+        stream_fd = None
+        if self._stream_path is not None:
+            self._stream_path.parent.mkdir(parents=True, exist_ok=True)
+            stream_fd = os.open(self._stream_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            os.write(stream_fd, dumps_line({"session_id": self._session_id, "start_time": self._start_time}))
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._closed = False
+        # Exceptions the writer thread hit, raised by the next flush()
+        self._write_errors: List[Exception] = []
+        self._writer = threading.Thread(
+            target=_write_events,
+            args=(self._queue, self._events, self._lock, self._write_errors, stream_fd),
+            name=f"MessageLogger-{self._session_id}",
+            daemon=True
+        )
+        self._writer.start()
+        weakref.finalize(self, self._queue.put, _STOP)
     
-    def _next_event_id(self) -> int:
-        """Get the next event ID."""
-        self._event_counter += 1
-        return self._event_counter
+    def enabled_for(self, level: str) -> bool:
+        """Whether events at ``level`` (e.g. "INFO") are recorded; lets callers skip building them."""
+        return logging.getLevelName(level.upper()) >= self._level
     
     def _get_iteration(self, agent_name: str) -> int:
         """Get current iteration for an agent."""
@@ -67,36 +230,62 @@ class MessageLogger:
     def log_event(
         self,
         agent_name: str,
-        event_type: EventType,
+        event_type: Union[EventType, str],
         data: Optional[Dict[str, Any]] = None,
         iteration: Optional[int] = None
     ) -> None:
-       
-        with self._lock:
-            event = LogEvent(
-                event_id=self._next_event_id(),
-                timestamp=datetime.utcnow().isoformat(),
-                agent_name=agent_name,
-                event_type=event_type.value,
-                iteration=iteration if iteration is not None else self._get_iteration(agent_name),
-                data=data or {}
-            )
-            self._events.append(event)
+        # EventType members are str, so they go into the event as they are
+        # and serialize to their value; plain strings are accepted too.
+        if self._closed or _EVENT_LEVELS.get(event_type, logging.INFO) < self._level:
+            return
+        
+        event = {
+            "event_id": 0,
+            "timestamp": time.time_ns(),
+            "agent_name": agent_name,
+            "event_type": event_type,
+            "iteration": iteration if iteration is not None else self._get_iteration(agent_name),
+            "data": data or {}
+        }
+        self._queue.put(event)
+    
+    def log_events_bulk(
+        self,
+        agent_name: str,
+        events: List[Tuple[Union[EventType, str], Dict[str, Any]]]
+    ) -> None:
+        """Log several (event_type, data) events for one agent as one queue item; the writer thread stores them together."""
+        timestamp = time.time_ns()
+        iteration = self._get_iteration(agent_name)
+        batch = [
+            {
+                "event_id": 0,
+                "timestamp": timestamp,
+                "agent_name": agent_name,
+                "event_type": event_type,
+                "iteration": iteration,
+                "data": data or {}
+            }
+            for event_type, data in events
+            if _EVENT_LEVELS.get(event_type, logging.INFO) >= self._level
+        ]
+        if batch and not self._closed:
+            self._queue.put(batch)
     
     def log_agent_start(self, agent_name: str, task_info: Dict[str, Any]) -> None:
         """Log the start of an agent's execution."""
         with self._lock:
             iteration = self._increment_iteration(agent_name)
-            self.log_event(
-                agent_name=agent_name,
-                event_type=EventType.AGENT_START,
-                data={
-                    "task": task_info.get("task", ""),
-                    "context_received": task_info.get("context", {}),
-                    "tools_available": task_info.get("tools", [])
-                },
-                iteration=iteration
-            )
+        self.log_event(
+            agent_name=agent_name,
+            event_type=EventType.AGENT_START,
+            data={
+                "task": task_info.get("task", ""),
+                "context_received": task_info.get("context", {}),
+                "tools_available": task_info.get("tools", [])
+            },
+            iteration=iteration
+        )
     
     def log_agent_end(self, agent_name: str, result: Dict[str, Any]) -> None:
        
@@ -127,17 +316,26 @@ class MessageLogger:
             }
         )
         
-        
+        # Tool results can be whole files; stringify them once
+        result_str = str(result) if result else ""
         self.log_event(
             agent_name=agent_name,
             event_type=EventType.TOOL_RESULT,
             data={
                 "tool_name": tool_name,
-                "result": str(result)[:2000] if result else None,  
-                "result_truncated": len(str(result)) > 2000 if result else False
+                "result": result_str[:2000] if result_str else None,  
+                "result_truncated": len(result_str) > 2000
             }
         )
     
+    def _tool_names(self, tools: Optional[List[Dict[str, Any]]]) -> List[str]:
+        if not tools:
+            return []
+        if tools is not self._last_tools:
+            self._last_tool_names = [t.get("function", {}).get("name", "unknown") for t in tools]
+            self._last_tools = tools
+        return self._last_tool_names
+    
     def log_llm_request(
         self,
         agent_name: str,
@@ -146,15 +344,18 @@ class MessageLogger:
         tools: Optional[List[Dict[str, Any]]] = None
     ) -> None:
         """Log an LLM API request."""
+        if not self.enabled_for("INFO"):
+            return
         
+        # Messages are only copied when their content actually needs cutting
         truncated_messages = []
         for msg in messages:
-            truncated_msg = msg.copy()
-            if "content" in truncated_msg and truncated_msg["content"]:
-                content = str(truncated_msg["content"])
-                if len(content) > 1000:
-                    truncated_msg["content"] = content[:1000] + "... [truncated]"
-            truncated_messages.append(truncated_msg)
+            content = msg.get("content")
+            if content and not isinstance(content, str):
+                content = str(content)
+            if content and len(content) > 1000:
+                msg = {**msg, "content": truncate(content, 1000, "... [truncated]")}
+            truncated_messages.append(msg)
         
         self.log_event(
             agent_name=agent_name,
@@ -162,7 +363,7 @@ class MessageLogger:
             data={
                 "model": model,
                 "messages": truncated_messages,
-                "tools_provided": [t.get("function", {}).get("name", "unknown") for t in (tools or [])],
+                "tools_provided": self._tool_names(tools),
                 "message_count": len(messages)
             }
         )
@@ -174,11 +375,13 @@ class MessageLogger:
         tool_calls: Optional[List[Dict[str, Any]]] = None
     ) -> None:
         """Log an LLM API response."""
+        if text_content:
+            text_content = truncate(text_content, 1000, "... [truncated]")
         self.log_event(
             agent_name=agent_name,
             event_type=EventType.LLM_RESPONSE,
             data={
-                "text_content": text_content[:1000] + "... [truncated]" if text_content and len(text_content) > 1000 else text_content,
+                "text_content": text_content,
                 "tool_calls": tool_calls or [],
                 "has_tool_calls": bool(tool_calls)
             }
@@ -229,40 +432,111 @@ class MessageLogger:
             }
         )
     
+    def _format_timestamps(self) -> None:
+        """Turn raw time_ns() stamps into ISO strings for events not yet snapshotted. Call with the lock held."""
+        events = self._events
+        for i in range(self._formatted_upto, len(events)):
+            events[i]["timestamp"] = utc_iso(events[i]["timestamp"])
+        self._formatted_upto = len(events)
+    
+    def _raise_write_error(self) -> None:
+        """Raise (once) the first error the writer hit since the last call, if any."""
+        with self._lock:
+            if not self._write_errors:
+                return
+            error = self._write_errors[0]
+            self._write_errors.clear()
+        raise error
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every event logged so far has been stored; False on timeout.
+        
+        Raises the first error the writer hit while storing events since the
+        previous flush, and RuntimeError if the writer thread is gone.
+        """
+        if not self._closed:
+            done = threading.Event()
+            self._queue.put(done)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            # Wait in bounded steps so a dead writer cannot hang the caller
+            while not done.is_set():
+                if not self._writer.is_alive() and not done.is_set():
+                    self._raise_write_error()
+                    raise RuntimeError("MessageLogger writer thread has stopped")
+                wait = _FLUSH_POLL_SECONDS
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                done.wait(wait)
+        self._raise_write_error()
+        return True
+    
+    def close(self) -> None:
+        """Store pending events and stop the writer thread. Further events are dropped."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+    
     def get_events(self) -> List[Dict[str, Any]]:
-        """Get all logged events as dictionaries."""
+        """Get all logged events as dictionaries (shared, read-only)."""
+        self.flush()
+        if self._stream_path is not None:
+            return to_single_json(self._stream_path)["events"]
         with self._lock:
-            return [e.to_dict() for e in self._events]
+            self._format_timestamps()
+            return self._events.copy()
     
     def get_events_for_agent(self, agent_name: str) -> List[Dict[str, Any]]:
         """Get all events for a specific agent."""
+        self.flush()
+        if self._stream_path is not None:
+            return [e for e in to_single_json(self._stream_path)["events"] if e["agent_name"] == agent_name]
         with self._lock:
-            return [e.to_dict() for e in self._events if e.agent_name == agent_name]
+            self._format_timestamps()
+            return [e for e in self._events if e["agent_name"] == agent_name]
     
     def get_full_log(self) -> Dict[str, Any]:
         """Get the complete log structure."""
-        with self._lock:
-            return {
-                "session_id": self._session_id,
-                "start_time": self._start_time,
-                "end_time": datetime.utcnow().isoformat(),
-                "total_events": len(self._events),
-                "agents_involved": list(set(e.agent_name for e in self._events if e.agent_name != "system")),
-                "events": self.get_events()
-            }
+        events = self.get_events()
+        return {
+            "session_id": self._session_id,
+            "start_time": self._start_time,
+            "end_time": datetime.utcnow().isoformat(),
+            "total_events": len(events),
+            "agents_involved": _agents_involved(events),
+            "events": events
+        }
     
-    def save(self, filepath: str) -> None:
+    def save(self, filepath: Optional[str] = None, pretty: bool = False) -> None:
         """
         Save the complete message history to a JSON file.
         
+        A streaming logger has already written its events; it appends the
+        session footer to the stream and only writes ``filepath`` if given.
+        
         Args:
             filepath: Path to save the JSON file
+            pretty: Indent the JSON for reading; compact otherwise
         """
-        with self._lock:
+        if self._stream_path is not None:
+            if not self._closed:
+                self._queue.put(dumps_line({"session_id": self._session_id, "end_time": datetime.utcnow().isoformat()}))
+                self.flush()
+            if filepath is None or Path(filepath) == self._stream_path:
+                return
+            full_log = to_single_json(self._stream_path)
             path = Path(filepath)
             path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self.get_full_log(), f, indent=2, ensure_ascii=False)
+            path.write_bytes(dumps(full_log, indent=pretty))
+            return
+        path = Path(filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(dumps(self.get_full_log(), indent=pretty))
     
     def __repr__(self) -> str:
         return f"MessageLogger(session={self._session_id}, events={len(self._events)})"
@@ -1,14 +1,16 @@
 
 
-import json
-from datetime import datetime
+import time
 from pathlib import Path
 from typing import Any, Dict, Optional
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, replace
 import threading
 
+from .clock import utc_iso
+from .json_utils import dumps, dumps_indented, loads
 
-@dataclass
+
+@dataclass(slots=True)
 class RCAResult:
     
     error_type: str = ""
@@ -21,14 +23,23 @@ class RCAResult:
     timestamp: str = ""
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "error_type": self.error_type,
+            "error_message": self.error_message,
+            "root_cause": self.root_cause,
+            "affected_file": self.affected_file,
+            "affected_line": self.affected_line,
+            "affected_function": self.affected_function,
+            "evidence": self.evidence,
+            "timestamp": self.timestamp
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "RCAResult":
         return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
 
-@dataclass
+@dataclass(slots=True)
 class FixPlan:
     
     description: str = ""
@@ -38,14 +49,20 @@ class FixPlan:
     timestamp: str = ""
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "description": self.description,
+            "steps": self.steps,
+            "safety_considerations": self.safety_considerations,
+            "expected_outcome": self.expected_outcome,
+            "timestamp": self.timestamp
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "FixPlan":
         return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
 
-@dataclass
+@dataclass(slots=True)
 class PatchMetadata:
     
     original_file: str = ""
@@ -56,13 +73,29 @@ class PatchMetadata:
     timestamp: str = ""
     
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "original_file": self.original_file,
+            "patched_file": self.patched_file,
+            "changes_made": self.changes_made,
+            "lines_modified": self.lines_modified,
+            "patch_content": self.patch_content,
+            "timestamp": self.timestamp
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "PatchMetadata":
         return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
 
+_SECTION_TYPES = {"rca": RCAResult, "fix_plan": FixPlan, "patch_metadata": PatchMetadata}
+
+# Upstream sections each agent gets to see
+_AGENT_CONTEXT_KEYS = {
+    "fix_agent": ("rca",),
+    "patch_agent": ("rca", "fix_plan"),
+}
+
+
 class SharedMemory:
     """
     Thread-safe shared memory for multi-agent communication.
@@ -70,114 +103,164 @@ class SharedMemory:
     
     def __init__(self):
         self._lock = threading.RLock()
+        created_at = utc_iso(time.time_ns())
         self._state: Dict[str, Any] = {
             "rca": None,
             "fix_plan": None,
             "patch_metadata": None,
             "metadata": {
-                "created_at": datetime.utcnow().isoformat(),
-                "last_updated": datetime.utcnow().isoformat(),
+                "created_at": created_at,
+                "last_updated": created_at,
                 "version": "1.0"
             }
         }
+        # Sections are stored as their dataclasses and only encoded on save;
+        # the plain-dict views handed to callers are built once per update.
+        self._dict_cache: Dict[str, Dict[str, Any]] = {}
+        self._last_updated_ns: Optional[int] = None
+        # Pretty-printed prompt context, rebuilt only when the section changes
+        self._rca_json_cache: Optional[str] = None
+        self._fix_plan_json_cache: Optional[str] = None
     
-    def _update_timestamp(self):
-        
-        self._state["metadata"]["last_updated"] = datetime.utcnow().isoformat()
+    def _update_timestamp(self, timestamp_ns: int):
+        # Only the raw reading is kept here; _sync_metadata formats it when
+        # the state is snapshotted or saved.
+        self._last_updated_ns = timestamp_ns
+    
+    def _sync_metadata(self) -> None:
+        if self._last_updated_ns is not None:
+            self._state["metadata"]["last_updated"] = utc_iso(self._last_updated_ns)
+            self._last_updated_ns = None
+    
+    def _section_dict(self, section: str) -> Optional[Dict[str, Any]]:
+        """Dict view of a section; callers must treat it as read-only. Call with the lock held."""
+        obj = self._state.get(section)
+        if obj is None:
+            return None
+        view = self._dict_cache.get(section)
+        if view is None:
+            view = self._dict_cache[section] = obj.to_dict()
+        return view
     
     
     def set_rca(self, rca: RCAResult) -> None:
       
         with self._lock:
-            rca.timestamp = datetime.utcnow().isoformat()
-            self._state["rca"] = rca.to_dict()
-            self._update_timestamp()
+            now = time.time_ns()
+            rca.timestamp = utc_iso(now)
+            self._state["rca"] = rca
+            self._dict_cache.pop("rca", None)
+            self._rca_json_cache = None
+            self._update_timestamp(now)
     
     def get_rca(self) -> Optional[RCAResult]:
        
         with self._lock:
             if self._state["rca"]:
-                return RCAResult.from_dict(self._state["rca"])
+                return replace(self._state["rca"])
             return None
     
     def get_rca_dict(self) -> Optional[Dict[str, Any]]:
        
         with self._lock:
-            return self._state.get("rca")
+            return self._section_dict("rca")
+    
+    def get_rca_json_indented(self) -> Optional[str]:
+        """RCA as indented JSON for prompts, or None if no RCA is set."""
+        with self._lock:
+            if self._rca_json_cache is None and self._state.get("rca"):
+                self._rca_json_cache = dumps_indented(self._section_dict("rca"))
+            return self._rca_json_cache
     
    
     def set_fix_plan(self, fix_plan: FixPlan) -> None:
        
         with self._lock:
-            fix_plan.timestamp = datetime.utcnow().isoformat()
-            self._state["fix_plan"] = fix_plan.to_dict()
-            self._update_timestamp()
+            now = time.time_ns()
+            fix_plan.timestamp = utc_iso(now)
+            self._state["fix_plan"] = fix_plan
+            self._dict_cache.pop("fix_plan", None)
+            self._fix_plan_json_cache = None
+            self._update_timestamp(now)
     
     def get_fix_plan(self) -> Optional[FixPlan]:
        
         with self._lock:
             if self._state["fix_plan"]:
-                return FixPlan.from_dict(self._state["fix_plan"])
+                return replace(self._state["fix_plan"])
             return None
     
     def get_fix_plan_dict(self) -> Optional[Dict[str, Any]]:
         
         with self._lock:
-            return self._state.get("fix_plan")
+            return self._section_dict("fix_plan")
+    
+    def get_fix_plan_json_indented(self) -> Optional[str]:
+        """Fix plan as indented JSON for prompts, or None if no plan is set."""
+        with self._lock:
+            if self._fix_plan_json_cache is None and self._state.get("fix_plan"):
+                self._fix_plan_json_cache = dumps_indented(self._section_dict("fix_plan"))
+            return self._fix_plan_json_cache
     
     
     def set_patch_metadata(self, patch: PatchMetadata) -> None:
        
         with self._lock:
-            patch.timestamp = datetime.utcnow().isoformat()
-            self._state["patch_metadata"] = patch.to_dict()
-            self._update_timestamp()
+            now = time.time_ns()
+            patch.timestamp = utc_iso(now)
+            self._state["patch_metadata"] = patch
+            self._dict_cache.pop("patch_metadata", None)
+            self._update_timestamp(now)
     
     def get_patch_metadata(self) -> Optional[PatchMetadata]:
        
         with self._lock:
             if self._state["patch_metadata"]:
-                return PatchMetadata.from_dict(self._state["patch_metadata"])
+                return replace(self._state["patch_metadata"])
             return None
     
     def get_patch_metadata_dict(self) -> Optional[Dict[str, Any]]:
         
         with self._lock:
-            return self._state.get("patch_metadata")
+            return self._section_dict("patch_metadata")
     
   
     def get_full_state(self) -> Dict[str, Any]:
-        
+        """Snapshot of every section as dicts; shares the cached views, so treat it as read-only."""
         with self._lock:
-            return json.loads(json.dumps(self._state))  # Deep copy
+            self._sync_metadata()
+            state = {section: self._section_dict(section) for section in _SECTION_TYPES}
+            state["metadata"] = dict(self._state["metadata"])
+            return state
     
     def get_context_for_agent(self, agent_name: str) -> Dict[str, Any]:
         
+        keys = _AGENT_CONTEXT_KEYS.get(agent_name, ())
         with self._lock:
-            if agent_name == "fix_agent":
-                return {"rca": self._state.get("rca")}
-            elif agent_name == "patch_agent":
-                return {
-                    "rca": self._state.get("rca"),
-                    "fix_plan": self._state.get("fix_plan")
-                }
-            else:
-                return {}
-    
-    def save(self, filepath: str) -> None:
+            return {key: self._section_dict(key) for key in keys}
+    
+    def save(self, filepath: str, pretty: bool = False) -> None:
+        """Write the state as JSON; compact unless ``pretty`` (2-space indent) is asked for."""
         with self._lock:
             path = Path(filepath)
             path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self._state, f, indent=2, ensure_ascii=False)
+            self._sync_metadata()
+            path.write_bytes(dumps(self._state, indent=pretty))
     
     def load(self, filepath: str) -> None:
         
         with self._lock:
             path = Path(filepath)
             if path.exists():
-                with open(path, "r", encoding="utf-8") as f:
-                    self._state = json.load(f)
+                state = loads(path.read_bytes())
+                for section, cls in _SECTION_TYPES.items():
+                    if state.get(section):
+                        state[section] = cls.from_dict(state[section])
+                self._state = state
+                self._dict_cache.clear()
+                self._last_updated_ns = None
+                self._rca_json_cache = None
+                self._fix_plan_json_cache = None
     
     def __repr__(self) -> str:
         return f"SharedMemory(rca={'set' if self._state['rca'] else 'empty'}, fix_plan={'set' if self._state['fix_plan'] else 'empty'}, patch={'set' if self._state['patch_metadata'] else 'empty'})"
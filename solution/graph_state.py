@@ -17,8 +17,11 @@ class RCAGraphState(TypedDict):
     
     rca: Optional[dict]
     fix_plan: Optional[dict]
-    patch_metadata: Optional[dict] 
-   
+    patch_metadata: Optional[dict]
+
+    # Affected file contents read alongside the Fix agent (see orchestrator.py)
+    prefetched_file: Optional[str]
+
     trace_path: str
     codebase_path: str
     output_dir: str
@@ -1,21 +1,22 @@
 
 
+import functools
 import os
-from langchain_groq import ChatGroq
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.language_models import BaseChatModel
+from typing import TYPE_CHECKING
 
+from config import load_env
 
-def get_llm_for_provider(provider: str = "auto") -> BaseChatModel:
-    
-  
-    provider = os.getenv("LLM_PROVIDER", provider).lower()
-    
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+
+@functools.lru_cache(maxsize=4)
+def _create_llm(provider: str, model_name: str) -> "BaseChatModel":
+    """One client per (provider, model), so repeated lookups reuse its HTTP connections."""
+    # Each provider SDK is imported only when that provider is used
     if provider == "groq":
-        if not os.getenv("GROQ_API_KEY"):
-            raise ValueError("GROQ_API_KEY required when LLM_PROVIDER=groq")
+        from langchain_groq import ChatGroq
         
-        model_name = os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905")
         print(f"Using Groq LLM service (model: {model_name})")
         
         return ChatGroq(
@@ -24,44 +25,48 @@ def get_llm_for_provider(provider: str = "auto") -> BaseChatModel:
             max_retries=2,
         )
     
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    
+    print(f"Using Google Gemini LLM service (model: {model_name})")
+    
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=0,
+        max_retries=2,
+    )
+
+
+def get_llm_for_provider(provider: str = "auto") -> "BaseChatModel":
+    
+  
+    load_env()
+    provider = os.getenv("LLM_PROVIDER", provider).lower()
+    
+    if provider == "groq":
+        if not os.getenv("GROQ_API_KEY"):
+            raise ValueError("GROQ_API_KEY required when LLM_PROVIDER=groq")
+    
     elif provider == "google":
         if not os.getenv("GOOGLE_API_KEY"):
             raise ValueError("GOOGLE_API_KEY required when LLM_PROVIDER=google")
-        
-        model_name = os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp")
-        print(f"Using Google Gemini LLM service (model: {model_name})")
-        
-        return ChatGoogleGenerativeAI(
-            model=model_name,
-            temperature=0,
-            max_retries=2,
-        )
     
     else:  
       
         if os.getenv("GROQ_API_KEY"):
-            model_name = os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905")
-            print(f"Using Groq LLM service (model: {model_name})")
-            
-            return ChatGroq(
-                model=model_name,
-                temperature=0,
-                max_retries=2,
-            )
+            provider = "groq"
         
         
         elif os.getenv("GOOGLE_API_KEY"):
-            model_name = os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp")
-            print(f"Using Google Gemini LLM service (model: {model_name})")
-            
-            return ChatGoogleGenerativeAI(
-                model=model_name,
-                temperature=0,
-                max_retries=2,
-            )
+            provider = "google"
         
         else:
             raise ValueError(
                 "No LLM provider available. Set GROQ_API_KEY or GOOGLE_API_KEY"
             )
-
+    
+    if provider == "groq":
+        model_name = os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905")
+    else:
+        model_name = os.getenv("GOOGLE_MODEL", "gemini-2.0-flash-exp")
+    
+    return _create_llm(provider, model_name)
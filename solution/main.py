@@ -10,20 +10,15 @@ from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from langgraph.graph import StateGraph, START, END
-
-from graph_state import RCAGraphState
 from config import (
     CODEBASE_PATH, 
     ERROR_TRACE_PATH, 
     OUTPUT_DIR,
+    LOG_LEVEL,
 )
 from core.shared_memory import SharedMemory
 from core.message_logger import MessageLogger
-from llm_provider import get_llm_for_provider
-from agents.rca_agent import create_rca_agent_node
-from agents.fix_agent import create_fix_agent_node
-from agents.patch_agent import create_patch_agent_node
+from core.context import bind
 
 
 async def run_rca_pipeline(
@@ -41,9 +36,13 @@ async def run_rca_pipeline(
     print(f"Output Dir: {output_dir}")
     print("=" * 60 + "\n")
     
+    # Imported here so that --help and argument errors don't pay for the
+    # LLM SDK / LangGraph imports
+    from llm_provider import get_llm_for_provider
+    from orchestrator import get_pipeline_graph, initial_state
     
     shared_memory = SharedMemory()
-    logger = MessageLogger()
+    logger = MessageLogger(level=LOG_LEVEL)
     
     
     logger.log_system("Pipeline started", {
@@ -65,100 +64,75 @@ async def run_rca_pipeline(
         "patch": None,
         "success": False
     }
+    partial_save = None
     
     try:
        
-        workflow = StateGraph(RCAGraphState)
-        
-    
-        workflow.add_node(
-            "rca_agent",
-            create_rca_agent_node(llm, logger, shared_memory, trace_path)
-        )
-        workflow.add_node(
-            "fix_agent", 
-            create_fix_agent_node(llm, logger, shared_memory)
-        )
-        workflow.add_node(
-            "patch_agent",
-            create_patch_agent_node(llm, logger, shared_memory, output_dir)
-        )
-        
-       
-        workflow.add_edge(START, "rca_agent")
-        workflow.add_edge("rca_agent", "fix_agent")
-        workflow.add_edge("fix_agent", "patch_agent")
-        workflow.add_edge("patch_agent", END)
-        
-      
-        graph = workflow.compile()
-        
-      
-        
-     
-        initial_state = {
-            "messages": [],
-            "rca": None,
-            "fix_plan": None,
-            "patch_metadata": None,
-            "trace_path": trace_path,
-            "codebase_path": codebase_path,
-            "output_dir": output_dir,
-        }
+        graph = get_pipeline_graph(llm)
         
      
         print("\n" + "-" * 40)
         print("PHASE 1: Root Cause Analysis")
         print("-" * 40)
         
-     
-        final_state = await graph.ainvoke(initial_state)
-        
-       
-        rca_data = shared_memory.get_rca_dict()
-        results["rca"] = {"parsed": rca_data, "success": rca_data is not None}
-        
-        if not rca_data:
-            print("Warning: RCA parsing may have issues, continuing anyway...")
-        
-        error_type = "Unknown"
-        if rca_data:
-            error_type = rca_data.get("error_type", "Unknown")
-        print(f"RCA Complete. Root cause identified: {error_type}")
-        
+        # Each phase is reported as soon as its node finishes
+        with bind(logger, shared_memory):
+            async for update in graph.astream(
+                initial_state(trace_path, output_dir, codebase_path),
+                stream_mode="updates"
+            ):
+                if "rca_agent" in update:
+                    rca_data = update["rca_agent"].get("rca")
+                    results["rca"] = {"parsed": rca_data, "success": rca_data is not None}
+                    
+                    if not rca_data:
+                        print("Warning: RCA parsing may have issues, continuing anyway...")
+                    
+                    error_type = "Unknown"
+                    if rca_data:
+                        error_type = rca_data.get("error_type", "Unknown")
+                    print(f"RCA Complete. Root cause identified: {error_type}")
+                    
+                    # Persist the RCA while the Fix agent waits on the LLM;
+                    # a fresh output dir does not exist yet at this point
+                    Path(output_dir).mkdir(parents=True, exist_ok=True)
+                    partial_save = asyncio.create_task(asyncio.to_thread(
+                        shared_memory.save, str(Path(output_dir) / "shared_memory.json")
+                    ))
+                    
 
-        print("\n" + "-" * 40)
-        print("PHASE 2: Fix Suggestion")
-        print("-" * 40)
-        
-    
-        fix_data = shared_memory.get_fix_plan_dict()
-        results["fix"] = {"parsed": fix_data, "success": fix_data is not None}
-        
-        if not fix_data:
-            print("Warning: Fix plan parsing may have issues, continuing anyway...")
-        
-        steps_count = 0
-        if fix_data:
-            steps_count = len(fix_data.get("steps", []))
-        print(f"Fix Plan Complete. Steps: {steps_count}")
-        
+                    print("\n" + "-" * 40)
+                    print("PHASE 2: Fix Suggestion")
+                    print("-" * 40)
+                
+                elif "fix_agent" in update:
+                    fix_data = update["fix_agent"].get("fix_plan")
+                    results["fix"] = {"parsed": fix_data, "success": fix_data is not None}
+                    
+                    if not fix_data:
+                        print("Warning: Fix plan parsing may have issues, continuing anyway...")
+                    
+                    steps_count = 0
+                    if fix_data:
+                        steps_count = len(fix_data.get("steps", []))
+                    print(f"Fix Plan Complete. Steps: {steps_count}")
+                    
  
-        print("\n" + "-" * 40)
-        print("PHASE 3: Patch Generation")
-        print("-" * 40)
-        
-      
-        patch_data = shared_memory.get_patch_metadata_dict()
-        results["patch"] = {"parsed": patch_data, "success": patch_data is not None}
-        
-        if not patch_data:
-            print("Warning: Patch metadata parsing may have issues...")
-        
-        patched_file = "Unknown"
-        if patch_data:
-            patched_file = patch_data.get("patched_file", "Unknown")
-        print(f"Patch Complete. File: {patched_file}")
+                    print("\n" + "-" * 40)
+                    print("PHASE 3: Patch Generation")
+                    print("-" * 40)
+                
+                elif "patch_agent" in update:
+                    patch_data = update["patch_agent"].get("patch_metadata")
+                    results["patch"] = {"parsed": patch_data, "success": patch_data is not None}
+                    
+                    if not patch_data:
+                        print("Warning: Patch metadata parsing may have issues...")
+                    
+                    patched_file = "Unknown"
+                    if patch_data:
+                        patched_file = patch_data.get("patched_file", "Unknown")
+                    print(f"Patch Complete. File: {patched_file}")
         
         results["success"] = True
         
@@ -177,16 +151,25 @@ async def run_rca_pipeline(
      
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
+        if partial_save is not None:
+            # The full save below supersedes it, so a failure is only reported
+            (partial_error,) = await asyncio.gather(partial_save, return_exceptions=True)
+            if isinstance(partial_error, Exception):
+                print(f"Warning: mid-run save failed: {type(partial_error).__name__}: {partial_error}")
+                logger.log_error("Pipeline", type(partial_error).__name__, str(partial_error))
         
      
         shared_memory_path = output_path / "shared_memory.json"
-        shared_memory.save(str(shared_memory_path))
-        print(f"Shared Memory saved to: {shared_memory_path}")
-        
-     
         message_history_path = output_path / "message_history.json"
         logger.log_system("Pipeline completed", {"success": results["success"]})
-        logger.save(str(message_history_path))
+        
+        # The two files are independent; write them side by side off the event loop
+        await asyncio.gather(
+            asyncio.to_thread(shared_memory.save, str(shared_memory_path)),
+            asyncio.to_thread(logger.save, str(message_history_path), pretty=True),
+        )
+        logger.close()
+        print(f"Shared Memory saved to: {shared_memory_path}")
         print(f"Message History saved to: {message_history_path}")
         
      
@@ -211,9 +194,9 @@ async def run_rca_pipeline(
     print("PIPELINE SUMMARY")
     print("=" * 60)
     
-    rca_data = shared_memory.get_rca_dict()
-    fix_data = shared_memory.get_fix_plan_dict()
-    patch_data = shared_memory.get_patch_metadata_dict()
+    rca_data = results["rca"]["parsed"] if results["rca"] else None
+    fix_data = results["fix"]["parsed"] if results["fix"] else None
+    patch_data = results["patch"]["parsed"] if results["patch"] else None
     
     if rca_data:
         print(f"\nRCA Results:")
@@ -243,6 +226,19 @@ async def run_rca_pipeline(
     return results
 
 
+def _run(coro):
+    """asyncio.run, on a uvloop event loop when uvloop is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
+
+
 def main():
     
     parser = argparse.ArgumentParser(
@@ -284,7 +280,7 @@ def main():
     
    
     try:
-        results = asyncio.run(run_rca_pipeline(
+        results = _run(run_rca_pipeline(
             trace_path=args.trace,
             codebase_path=args.codebase,
             output_dir=args.output
@@ -0,0 +1,182 @@
+"""
+Pipeline orchestration for the RCA -> Fix -> Patch graph.
+
+The Fix agent only needs the RCA, and the Patch agent's first move is always
+to read the affected file. Once RCA has set ``affected_file`` we therefore read
+that file concurrently with the Fix agent and hand the contents to the Patch
+agent, taking the file read off the critical path.
+
+The graph itself does not depend on the run: nodes take the trace path and
+output directory from the state and the logger / shared memory from
+core.context, so one compiled graph per LLM (see get_pipeline_graph) serves
+every run.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.context import bind, resolve
+from core.shared_memory import SharedMemory
+from core.message_logger import MessageLogger
+from agents.rca_agent import create_rca_agent_node
+from agents.fix_agent import create_fix_agent_node
+from agents.patch_agent import create_patch_agent_node
+
+
+async def _prefetch_file(file_path: str) -> Optional[str]:
+    """Read the affected file the same way the Patch agent's tool call would."""
+    from tools.file_tools import read_file
+    
+    content = await read_file.ainvoke({"file_path": file_path})
+    if content.startswith("Error"):
+        return None
+    return content
+
+
+def create_fix_with_prefetch_node(
+    llm,
+    logger: Optional[MessageLogger] = None,
+    shared_memory: Optional[SharedMemory] = None
+):
+    """
+    Wrap the Fix agent node so the affected file is prefetched alongside it.
+
+    The prefetch is speculative: it is cancelled if the Fix agent fails, and
+    its result is dropped if the RCA's ``affected_file`` no longer matches the
+    file that was read by the time both tasks finish.
+    """
+    fix_node = create_fix_agent_node(llm, logger, shared_memory)
+    default_logger, default_memory = logger, shared_memory
+
+    async def fix_with_prefetch_node(state: dict) -> dict:
+        logger, shared_memory = resolve(default_logger, default_memory)
+        rca_dict = shared_memory.get_rca_dict()
+        speculative_file = rca_dict.get("affected_file") if rca_dict else None
+        if not speculative_file:
+            return await fix_node(state)
+
+        prefetch_task = asyncio.create_task(_prefetch_file(speculative_file))
+        try:
+            update, prefetched = await asyncio.gather(fix_node(state), prefetch_task)
+        except BaseException:
+            prefetch_task.cancel()
+            raise
+
+        rca_dict = shared_memory.get_rca_dict()
+        if prefetched and rca_dict and rca_dict.get("affected_file") == speculative_file:
+            update["prefetched_file"] = prefetched
+            logger.log_system("Prefetched affected file", {"file": speculative_file})
+
+        return update
+
+    return fix_with_prefetch_node
+
+
+def build_pipeline_graph(
+    llm,
+    logger: Optional[MessageLogger] = None,
+    shared_memory: Optional[SharedMemory] = None,
+    trace_path: str = "",
+    output_dir: str = ""
+):
+    """
+    Build and compile the RCA -> (Fix || PrefetchFile) -> Patch graph.
+
+    Leave logger and shared_memory out to get a graph that can be shared by
+    concurrent runs, each under its own core.context.bind() (see run_pipeline).
+
+    Args:
+        llm: LangChain LLM instance shared by all agents
+        logger: MessageLogger for capturing interactions
+        shared_memory: SharedMemory the agents read from and write to
+        trace_path: Path to error trace file, if the state does not carry one
+        output_dir: Directory to write patched files to
+
+    Returns:
+        Compiled LangGraph graph
+    """
+    from langgraph.graph import StateGraph, START, END
+    from graph_state import RCAGraphState
+    
+    workflow = StateGraph(RCAGraphState)
+
+    workflow.add_node(
+        "rca_agent",
+        create_rca_agent_node(llm, logger, shared_memory, trace_path)
+    )
+    workflow.add_node(
+        "fix_agent",
+        create_fix_with_prefetch_node(llm, logger, shared_memory)
+    )
+    workflow.add_node(
+        "patch_agent",
+        create_patch_agent_node(llm, logger, shared_memory, output_dir)
+    )
+
+    workflow.add_edge(START, "rca_agent")
+    workflow.add_edge("rca_agent", "fix_agent")
+    workflow.add_edge("fix_agent", "patch_agent")
+    workflow.add_edge("patch_agent", END)
+
+    return workflow.compile()
+
+
+# id(llm) -> (llm, compiled run-independent pipeline graph); the llm is kept
+# alongside so its id cannot be recycled while cached.
+_PIPELINE_GRAPHS: Dict[int, Tuple[Any, Any]] = {}
+
+
+def get_pipeline_graph(llm):
+    """The compiled pipeline graph for ``llm``, built on first use and shared by all runs."""
+    cached = _PIPELINE_GRAPHS.get(id(llm))
+    if cached is None or cached[0] is not llm:
+        cached = (llm, build_pipeline_graph(llm))
+        _PIPELINE_GRAPHS[id(llm)] = cached
+    return cached[1]
+
+
+def initial_state(trace_path: str, output_dir: str, codebase_path: str = "") -> Dict[str, Any]:
+    """Graph input for one run of the pipeline."""
+    return {
+        "messages": [],
+        "rca": None,
+        "fix_plan": None,
+        "patch_metadata": None,
+        "prefetched_file": None,
+        "trace_path": str(trace_path),
+        "codebase_path": str(codebase_path),
+        "output_dir": str(output_dir),
+    }
+
+
+async def run_pipeline(
+    graph,
+    trace_path: str,
+    output_dir: str,
+    codebase_path: str = "",
+    logger: Optional[MessageLogger] = None,
+    shared_memory: Optional[SharedMemory] = None
+) -> Dict[str, Any]:
+    """
+    Run one trace through a compiled pipeline graph with its own logger and memory.
+
+    A fresh logger / shared memory is created for whichever is not given.
+
+    Returns:
+        Dictionary with the final graph state, the MessageLogger and the SharedMemory
+    """
+    if shared_memory is None:
+        shared_memory = SharedMemory()
+    if logger is None:
+        logger = MessageLogger()
+    with bind(logger, shared_memory):
+        final_state = await graph.ainvoke(initial_state(trace_path, output_dir, codebase_path))
+    return {"state": final_state, "logger": logger, "shared_memory": shared_memory}
+
+
+async def run_pipelines(llm, trace_paths: List[str], output_dir: str) -> List[Dict[str, Any]]:
+    """Run several traces concurrently over one compiled graph; results are in input order."""
+    graph = get_pipeline_graph(llm)
+    return await asyncio.gather(*(
+        run_pipeline(graph, trace_path, output_dir) for trace_path in trace_paths
+    ))
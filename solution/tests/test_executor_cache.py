@@ -0,0 +1,31 @@
+from collections import OrderedDict
+
+from agents.executor_cache import AGENT_CACHE_SIZE, cache_get, cache_put
+
+
+def test_cache_put_evicts_least_recently_used():
+    cache = OrderedDict()
+    for i in range(AGENT_CACHE_SIZE):
+        cache_put(cache, str(i), i)
+
+    assert cache_get(cache, "0") == 0
+    cache_put(cache, "new", -1)
+
+    assert len(cache) == AGENT_CACHE_SIZE
+    assert cache_get(cache, "1") is None
+    assert cache_get(cache, "0") == 0
+    assert cache_get(cache, "new") == -1
+
+
+def test_get_react_agent_is_bounded_and_keyed_on_the_llm_object():
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    from agents import executor_cache
+
+    llm = FakeListChatModel(responses=["ok"])
+    first = executor_cache.get_react_agent(llm, [], "prompt")
+    assert executor_cache.get_react_agent(llm, [], "prompt") is first
+
+    for i in range(AGENT_CACHE_SIZE + 5):
+        executor_cache.get_react_agent(FakeListChatModel(responses=["ok"]), [], f"prompt {i}")
+    assert len(executor_cache._REACT_AGENTS) == AGENT_CACHE_SIZE
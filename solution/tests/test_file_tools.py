@@ -0,0 +1,30 @@
+import os
+
+from tools.file_tools import _resolve_file
+
+
+def test_resolve_file_finds_file_created_after_a_miss(tmp_path):
+    cwd = os.getcwd()
+    os.chdir(tmp_path)
+    try:
+        assert _resolve_file("created_later.py") is None
+        (tmp_path / "created_later.py").write_text("x = 1\n")
+        assert _resolve_file("created_later.py") == (tmp_path / "created_later.py").resolve()
+    finally:
+        os.chdir(cwd)
+
+
+def test_resolve_file_follows_working_directory(tmp_path):
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    (first / "only_here.py").write_text("x = 1\n")
+    cwd = os.getcwd()
+    try:
+        os.chdir(first)
+        assert _resolve_file("only_here.py") == (first / "only_here.py").resolve()
+        os.chdir(second)
+        assert _resolve_file("only_here.py") is None
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,13 @@
+from agents.fix_agent import _parse_fix_output
+
+
+def test_parse_fix_output_with_nested_object_before_description():
+    output = (
+        'Plan: {"meta": {"source": "rca", "note": "{"}, "steps": ["guard None"],'
+        ' "description": "check for None", "expected_outcome": "no crash"} end'
+    )
+
+    result = _parse_fix_output(output)
+
+    assert result.description == "check for None"
+    assert result.steps == ["guard None"]
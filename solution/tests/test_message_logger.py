@@ -0,0 +1,49 @@
+import pytest
+
+from core.message_logger import MessageLogger, _STOP
+
+
+def test_flush_raises_writer_error_and_keeps_logging():
+    logger = MessageLogger()
+    logger.log_system("before")
+    # Not an event: the writer fails on it
+    logger._queue.put([None])
+    logger.log_system("after")
+
+    with pytest.raises(TypeError):
+        logger.flush()
+
+    # The error is raised once, and the writer is still storing events
+    assert logger.flush() is True
+    assert [e["data"]["message"] for e in logger.get_events()] == ["before", "after"]
+    logger.close()
+
+
+def test_flush_does_not_hang_when_writer_is_gone():
+    logger = MessageLogger()
+    logger._queue.put(_STOP)
+    logger._writer.join()
+
+    with pytest.raises(RuntimeError):
+        logger.flush()
+
+
+def test_stream_mode_survives_unserializable_event(tmp_path):
+    stream_path = tmp_path / "history.ndjson"
+    logger = MessageLogger(stream_path=str(stream_path))
+    logger.log_events_bulk("RCA_Agent", [
+        ("system", {"message": "ok"}),
+        ("system", {"message": object()}),
+    ])
+    logger.log_system("after")
+
+    with pytest.raises(TypeError):
+        logger.save()
+
+    # The bad event was dropped, everything around it was written, and the
+    # stream is still open for more
+    logger.log_system("later")
+    logger.save()
+    messages = [e["data"]["message"] for e in logger.get_events()]
+    assert messages == ["ok", "after", "later"]
+    logger.close()
@@ -0,0 +1,22 @@
+from agents.patch_agent import _parse_patch_output
+
+
+def test_parse_patch_output_with_nested_object():
+    output = (
+        "Patch written.\n"
+        '{"details": {"tool": "write_file", "note": "kept {} literal"},'
+        ' "original_file": "app/db.py", "patched_file": "fixed_db.py",'
+        ' "lines_modified": [12]}\n'
+        "Done."
+    )
+
+    result = _parse_patch_output(output)
+
+    assert result.original_file == "app/db.py"
+    assert result.patched_file == "fixed_db.py"
+    assert result.changes_made == []
+    assert result.lines_modified == [12]
+
+
+def test_parse_patch_output_without_json():
+    assert _parse_patch_output("I wrote the file.") is None
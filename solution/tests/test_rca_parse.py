@@ -0,0 +1,29 @@
+from agents.rca_agent import _parse_rca_output
+
+
+def test_parse_rca_output_with_nested_evidence():
+    output = (
+        "Analysis done.\n"
+        '{"evidence": [{"file": "app/db.py", "frame": {"line": 12, "code": "cfg = {}"}}],'
+        ' "error_type": "KeyError", "error_message": "\'host\'",'
+        ' "root_cause": "config dict {} has no host", "affected_file": "app/db.py",'
+        ' "affected_line": 12, "affected_function": "connect"}\n'
+        "Let me know if you need more."
+    )
+
+    result = _parse_rca_output(output)
+
+    assert result.error_type == "KeyError"
+    assert result.root_cause == "config dict {} has no host"
+    assert result.affected_line == 12
+    assert result.evidence == [{"file": "app/db.py", "frame": {"line": 12, "code": "cfg = {}"}}]
+
+
+def test_parse_rca_output_rejects_undecodable_json():
+    assert _parse_rca_output('Result: {"error_type": "KeyError", "evidence": [}') is None
+
+
+def test_parse_rca_output_coerces_affected_line():
+    for raw, expected in (('"line 42"', 42), ("42.0", 42), ("null", 0), ("true", 0)):
+        output = '{"error_type": "KeyError", "affected_line": %s}' % raw
+        assert _parse_rca_output(output).affected_line == expected
@@ -1,5 +1,13 @@
 
 
+import os
+import sys
+
+# Project directory on sys.path for the top-level imports below; see agents/__init__.py
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_DIR not in sys.path:
+    sys.path.insert(0, _PROJECT_DIR)
+
 from .file_tools import read_file, write_file, list_directory
 from .analysis_tools import parse_error_trace
 from .terminal_tools import run_terminal_command
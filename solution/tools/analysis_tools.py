@@ -2,12 +2,9 @@
 import json
 from pathlib import Path
 from typing import Any, Dict, List, Optional
-import sys
-
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import ERROR_TRACE_PATH
+from core.json_utils import loads
 
 
 from langchain_core.tools import tool
@@ -16,37 +13,33 @@ from langchain_core.tools import tool
 def _extract_stack_frames(stack_details: str) -> List[Dict[str, Any]]:
     
     try:
-        frames = json.loads(stack_details)
+        frames = loads(stack_details)
         return frames if isinstance(frames, list) else []
-    except (json.JSONDecodeError, TypeError):
+    except (ValueError, TypeError):
         return []
 
 
 def _filter_internal_frames(frames: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     
-    internal_frames = []
-    for frame in frames:
-        is_external = frame.get("exception.is_file_external", "true")
-        if is_external == "false" or is_external is False:
-            internal_frames.append(frame)
-    return internal_frames
+    # Traces spell "not external" either as the string or as a JSON boolean;
+    # explicit comparisons, so 0 or an unhashable value is never "false"
+    return [
+        frame
+        for frame in frames
+        if (is_external := frame.get("exception.is_file_external", "true")) == "false"
+        or is_external is False
+    ]
 
 
-def _format_frame(frame: Dict[str, Any]) -> str:
-    """Format a single stack frame for readable output."""
-    file_path = frame.get("exception.file", "unknown")
-    line_num = frame.get("exception.line", "?")
-    func_name = frame.get("exception.function_name", "unknown")
-    func_body = frame.get("exception.function_body", "")
-    
-    output = f"""
-File: {file_path}
-Line: {line_num}
-Function: {func_name}
-Code:
-{func_body}
-"""
-    return output.strip()
+def _extend_frame_lines(out: List[str], frame: Dict[str, Any]) -> None:
+    """Append a single stack frame's readable lines to ``out``."""
+    out.append(f"File: {frame.get('exception.file', 'unknown')}")
+    out.append(f"Line: {frame.get('exception.line', '?')}")
+    out.append(f"Function: {frame.get('exception.function_name', 'unknown')}")
+    out.append("Code:")
+    func_body = (frame.get("exception.function_body") or "").rstrip()
+    if func_body:
+        out.append(func_body)
 
 
 @tool
@@ -82,8 +75,7 @@ def parse_error_trace(trace_path: str) -> str:
             return f"Error: Trace file not found at {path}"
         
         
-        with open(path, "r", encoding="utf-8") as f:
-            trace_data = json.load(f)
+        trace_data = loads(path.read_bytes())
         
         
         if isinstance(trace_data, list):
@@ -123,8 +115,9 @@ def parse_error_trace(trace_path: str) -> str:
         
         if internal_frames:
             for i, frame in enumerate(internal_frames, 1):
-                output_parts.append(f"\n--- Frame {i} ---")
-                output_parts.append(_format_frame(frame))
+                output_parts.append("")
+                output_parts.append(f"--- Frame {i} ---")
+                _extend_frame_lines(output_parts, frame)
         else:
             output_parts.append("No internal frames found (error may be in library code)")
         
@@ -147,7 +140,8 @@ def parse_error_trace(trace_path: str) -> str:
             "-" * 40,
             "FULL STACKTRACE:",
             "-" * 40,
-            full_stacktrace[:2000] + ("... [truncated]" if len(full_stacktrace) > 2000 else ""),
+            # Short traces go in as they are; only long ones are copied to cut them
+            full_stacktrace if len(full_stacktrace) <= 2000 else full_stacktrace[:2000] + "... [truncated]",
         ])
         
       
@@ -1,12 +1,11 @@
 
 
+import functools
+import itertools
 import os
+import stat
 from pathlib import Path
-from typing import Optional
-import sys
-
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from typing import List, Optional, Tuple
 
 from config import MAX_FILE_SIZE_BYTES, ALLOWED_READ_EXTENSIONS, OUTPUT_DIR, CODEBASE_PATH
 
@@ -48,6 +47,115 @@ def _is_path_within_allowed(path: Path, allowed_roots: list) -> bool:
     return False
 
 
+# Candidate lookups use plain os.path strings; Path objects are only built
+# for what is handed back.
+_CODEBASE_ROOT = str(CODEBASE_PATH)
+_CODEBASE_APP = os.path.join(_CODEBASE_ROOT, "app")
+_APP_SUBDIRS = ("services/", "models/", "routes/", "config/", "utils/")
+
+
+def _file_candidates(file_path: str) -> List[str]:
+    """Where a (trace-style) file path may live locally, most likely first."""
+    if os.path.isabs(file_path):
+        return [file_path]
+    
+    # Try various combinations
+    candidates = [
+        os.path.join(_CODEBASE_APP, file_path),  
+        os.path.join(_CODEBASE_ROOT, file_path),         
+        file_path,                   
+    ]
+    
+    
+    if file_path.startswith(_APP_SUBDIRS):
+        candidates.insert(0, candidates[0])
+    return candidates
+
+
+def _dir_candidates(dir_path: str) -> List[str]:
+    if os.path.isabs(dir_path):
+        return [dir_path]
+    return [
+        os.path.join(_CODEBASE_APP, dir_path),
+        os.path.join(_CODEBASE_ROOT, dir_path),
+        dir_path,
+    ]
+
+
+# Agents ask for the same handful of paths over and over; remember where each
+# one resolved to. Only hits are kept: a miss raises, which lru_cache does not
+# store, so a file created later is found on the next lookup. The last
+# candidate is relative to the working directory, so that is part of the key.
+# Callers re-check the hit they get back, and write_file drops everything
+# since a new file can shadow a later candidate.
+@functools.lru_cache(maxsize=4096)
+def _lookup_file(file_path: str, cwd: str) -> Path:
+    for candidate in _file_candidates(file_path):
+        try:
+            if os.path.exists(candidate):
+                return Path(os.path.realpath(candidate))
+        except Exception:
+            continue
+    raise FileNotFoundError(file_path)
+
+
+@functools.lru_cache(maxsize=4096)
+def _lookup_dir(dir_path: str, cwd: str) -> Path:
+    for candidate in _dir_candidates(dir_path):
+        try:
+            if os.path.isdir(candidate):
+                return Path(os.path.realpath(candidate))
+        except Exception:
+            continue
+    raise FileNotFoundError(dir_path)
+
+
+def _resolve_file(file_path: str) -> Optional[Path]:
+    try:
+        return _lookup_file(file_path, os.getcwd())
+    except FileNotFoundError:
+        return None
+
+
+def _resolve_dir(dir_path: str) -> Optional[Path]:
+    try:
+        return _lookup_dir(dir_path, os.getcwd())
+    except FileNotFoundError:
+        return None
+
+
+def _read_bytes(path: str, size: int) -> bytes:
+    """Read a (size-capped, so small) file in one pread, bypassing the io stack."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.pread(fd, size, 0)
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=64)
+def _load_lines(path: str, mtime_ns: int, size: int) -> Tuple[str, List[int]]:
+    """
+    Decoded text of a file plus the offset each of its lines starts at.
+
+    ``line_starts`` has one more entry than there are lines, so line i
+    (0-based) is ``text[line_starts[i]:line_starts[i + 1] - 1]``. Keyed on
+    mtime and size so an edited file is read again.
+    """
+    data = _read_bytes(path, size)
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+     
+        text = data.decode("latin-1")
+    # Same newlines text-mode open() would have given
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    line_starts = [0]
+    line_starts.extend(itertools.accumulate(len(line) + 1 for line in text.split("\n")))
+    return text, line_starts
+
+
 @tool
 def read_file(file_path: str, start_line: Optional[int] = None, end_line: Optional[int] = None) -> str:
     """
@@ -71,54 +179,34 @@ def read_file(file_path: str, start_line: Optional[int] = None, end_line: Option
             local_path = file_path.replace("/usr/srv/app/", "")
             file_path = local_path
         
-        
-        path = Path(file_path)
-        
-       
-        candidates = []
-        
-        if path.is_absolute():
-            candidates.append(path)
-        else:
-            # Try various combinations
-            candidates.extend([
-                CODEBASE_PATH / "app" / file_path,  
-                CODEBASE_PATH / file_path,         
-                Path(file_path),                   
-            ])
+        # The extension is checked before anything touches the disk; then one
+        # stat answers is-a-file / size. A cached hit may have been deleted
+        # since, so a missing file gets one fresh lookup before giving up.
+        for attempt in range(2):
+            resolved_path = _resolve_file(file_path)
+            if resolved_path is None:
+                return f"Error: File not found. Original path: {original_path}\nSearched in:\n" + "\n".join(f"  - {c}" for c in _file_candidates(file_path))
             
+            suffix = resolved_path.suffix.lower()
+            if suffix not in ALLOWED_READ_EXTENSIONS:
+                return f"Error: File type not allowed. Allowed types: {', '.join(ALLOWED_READ_EXTENSIONS)}"
             
-            if any(file_path.startswith(d) for d in ["services/", "models/", "routes/", "config/", "utils/"]):
-                candidates.insert(0, CODEBASE_PATH / "app" / file_path)
-        
-        resolved_path = None
-        for candidate in candidates:
             try:
-                if candidate.exists():
-                    resolved_path = candidate.resolve()
-                    break
-            except Exception:
-                continue
-        
-        if resolved_path is None:
-            return f"Error: File not found. Original path: {original_path}\nSearched in:\n" + "\n".join(f"  - {c}" for c in candidates)
-        
-        
-        if not resolved_path.exists():
-            return f"Error: File does not exist: {resolved_path}"
-        
-        if not resolved_path.is_file():
+                file_stat = os.stat(resolved_path)
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise
+                _lookup_file.cache_clear()
+        
+        if not stat.S_ISREG(file_stat.st_mode):
             return f"Error: Path is not a file: {resolved_path}"
         
         
-        file_size = resolved_path.stat().st_size
+        file_size = file_stat.st_size
         if file_size > MAX_FILE_SIZE_BYTES:
             return f"Error: File too large ({file_size} bytes). Maximum allowed: {MAX_FILE_SIZE_BYTES} bytes"
         
-        
-        if resolved_path.suffix.lower() not in ALLOWED_READ_EXTENSIONS:
-            return f"Error: File type not allowed. Allowed types: {', '.join(ALLOWED_READ_EXTENSIONS)}"
-        
     
         if start_line is not None and start_line < 1:
             return "Error: start_line must be >= 1"
@@ -129,19 +217,10 @@ def read_file(file_path: str, start_line: Optional[int] = None, end_line: Option
 
        
         try:
-            with open(resolved_path, "r", encoding="utf-8") as f:
-                content = f.read()
-        except UnicodeDecodeError:
-         
-            try:
-                with open(resolved_path, "r", encoding="latin-1") as f:
-                    content = f.read()
-            except Exception as e:
-                return f"Error: Could not decode file contents: {e}"
-        
-       
-        lines = content.split("\n")
-        total_lines = len(lines)
+            content, line_starts = _load_lines(str(resolved_path), file_stat.st_mtime_ns, file_size)
+        except Exception as e:
+            return f"Error: Could not decode file contents: {e}"
+        total_lines = len(line_starts) - 1
 
        
         start_idx = (start_line - 1) if start_line else 0
@@ -159,8 +238,12 @@ def read_file(file_path: str, start_line: Optional[int] = None, end_line: Option
         else:
             truncated_note = ""
 
-        selected_lines = lines[start_idx:end_idx]
-        numbered_content = "\n".join(f"{i + start_idx + 1:4d} | {line}" for i, line in enumerate(selected_lines))
+        # Only the requested range is cut out and split
+        selected_lines = content[line_starts[start_idx]:line_starts[end_idx] - 1].split("\n") if end_idx > start_idx else []
+        numbered_content = "\n".join([
+            "%4d | %s" % numbered
+            for numbered in zip(range(start_idx + 1, end_idx + 1), selected_lines)
+        ])
         
         range_info = ""
         if start_line or end_line:
@@ -213,12 +296,18 @@ def write_file(file_path: str, content: str) -> str:
             output_path.rename(backup_path)
         
        
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        # Encode once: the bytes are both written and measured
+        data = content.encode("utf-8")
+        with open(output_path, "wb") as f:
+            f.write(data)
+        
+        # The new file may shadow a path a cached lookup resolved elsewhere
+        _lookup_file.cache_clear()
+        _lookup_dir.cache_clear()
         
       
-        written_size = output_path.stat().st_size
-        line_count = content.count("\n") + 1
+        written_size = len(data)
+        line_count = data.count(b"\n") + 1
         
         return f"Success: File written to {output_path}\nSize: {written_size} bytes\nLines: {line_count}"
         
@@ -248,44 +337,30 @@ def list_directory(dir_path: str) -> str:
         if dir_path.startswith("/usr/srv/app/"):
             dir_path = dir_path.replace("/usr/srv/app/", "")
         
-       
-        path = Path(dir_path)
-        
-       
-        candidates = []
-        if path.is_absolute():
-            candidates.append(path)
-        else:
-            candidates.extend([
-                CODEBASE_PATH / "app" / dir_path,
-                CODEBASE_PATH / dir_path,
-                Path(dir_path),
-            ])
-        
-        resolved_path = None
-        for candidate in candidates:
-            try:
-                if candidate.exists() and candidate.is_dir():
-                    resolved_path = candidate.resolve()
-                    break
-            except Exception:
-                continue
+        resolved_path = _resolve_dir(dir_path)
+        if resolved_path is not None and not os.path.isdir(resolved_path):
+            _lookup_dir.cache_clear()
+            resolved_path = _resolve_dir(dir_path)
         
         if resolved_path is None:
-            return f"Error: Directory not found. Original: {original_path}\nSearched:\n" + "\n".join(f"  - {c}" for c in candidates)
+            return f"Error: Directory not found. Original: {original_path}\nSearched:\n" + "\n".join(f"  - {c}" for c in _dir_candidates(dir_path))
         
     
         items = []
         try:
-            for item in sorted(resolved_path.iterdir()):
-                if item.name.startswith("."):
+            # scandir's entries know their type from the directory read, so
+            # only files cost a stat (for the size)
+            with os.scandir(resolved_path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+            for entry in entries:
+                if entry.name[0] == ".":
                     continue  
                     
-                if item.is_dir():
-                    items.append(f"  [DIR]  {item.name}/")
+                if entry.is_dir():
+                    items.append(f"  [DIR]  {entry.name}/")
                 else:
-                    size = item.stat().st_size
-                    items.append(f"  [FILE] {item.name} ({size} bytes)")
+                    size = entry.stat().st_size
+                    items.append(f"  [FILE] {entry.name} ({size} bytes)")
         except PermissionError:
             return f"Error: Permission denied accessing {resolved_path}"
         
@@ -1,22 +1,38 @@
 
 
+import asyncio
+import locale
 import os
+import shlex
 import subprocess
-from pathlib import Path
-import sys
-
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import PROJECT_ROOT
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 
 
 DEFAULT_WORKSPACE = PROJECT_ROOT
 
+# Anything the shell itself would interpret (pipes, redirects, expansion,
+# globbing, grouping, comments) needs /bin/sh; plain commands are exec'd
+# directly, saving the extra shell process.
+_SHELL_CHARS = frozenset("|&;<>$`*?[]~(){}#\\\n")
 
-@tool
-def run_terminal_command(command: str) -> str:
+
+def _direct_argv(command: str):
+    """argv for running ``command`` without a shell, or None if it needs one."""
+    if not _SHELL_CHARS.isdisjoint(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    # VAR=value prefixes are shell syntax too
+    if not argv or "=" in argv[0]:
+        return None
+    return argv
+
+
+def _run_terminal_command(command: str) -> str:
     """
     Run a shell command in the project workspace and return its output.
 
@@ -33,24 +49,106 @@ def run_terminal_command(command: str) -> str:
         
         os.makedirs(DEFAULT_WORKSPACE, exist_ok=True)
 
-        result = subprocess.run(
-            command,
-            shell=True,
-            cwd=str(DEFAULT_WORKSPACE),
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-
-        output = result.stdout or ""
-        error = result.stderr or ""
-        if result.returncode != 0:
-            return f"Command exited with code {result.returncode}.\nSTDOUT:\n{output}\nSTDERR:\n{error}"
-
-        return output if output else "(no output)"
+        argv = _direct_argv(command)
+        result = None
+        if argv is not None:
+            try:
+                result = subprocess.run(
+                    argv,
+                    cwd=str(DEFAULT_WORKSPACE),
+                    capture_output=True,
+                    text=True,
+                    timeout=30,
+                )
+            except (FileNotFoundError, PermissionError):
+                # Not an executable (e.g. a shell builtin); let the shell
+                # run it or report it as before
+                result = None
+        if result is None:
+            result = subprocess.run(
+                command,
+                shell=True,
+                cwd=str(DEFAULT_WORKSPACE),
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+
+        return _format_result(result.returncode, result.stdout, result.stderr)
     except subprocess.TimeoutExpired:
         return "Error: command timed out after 30 seconds"
     except Exception as e:
         return f"Error running command: {type(e).__name__}: {e}"
 
 
+def _format_result(returncode: int, output: str, error: str) -> str:
+    output = output or ""
+    error = error or ""
+    if returncode != 0:
+        return f"Command exited with code {returncode}.\nSTDOUT:\n{output}\nSTDERR:\n{error}"
+
+    return output if output else "(no output)"
+
+
+def _decode(data: bytes) -> str:
+    """Decode captured output the way subprocess.run(text=True) does (strict, so
+    undecodable output is reported as an error on both paths)."""
+    text = data.decode(locale.getpreferredencoding(False))
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+async def _run_terminal_command_async(command: str) -> str:
+    """
+    Non-blocking _run_terminal_command for async agents: the event loop keeps
+    serving LLM calls and other tools while the command runs.
+    """
+    try:
+        if not command or not command.strip():
+            return "Error: command cannot be empty"
+
+        
+        os.makedirs(DEFAULT_WORKSPACE, exist_ok=True)
+
+        argv = _direct_argv(command)
+        proc = None
+        if argv is not None:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *argv,
+                    cwd=str(DEFAULT_WORKSPACE),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except (FileNotFoundError, PermissionError):
+                proc = None
+        if proc is None:
+            proc = await asyncio.create_subprocess_shell(
+                command,
+                cwd=str(DEFAULT_WORKSPACE),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+
+        try:
+            output, error = await asyncio.wait_for(proc.communicate(), timeout=30)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return "Error: command timed out after 30 seconds"
+
+        return _format_result(proc.returncode, _decode(output), _decode(error))
+    except Exception as e:
+        return f"Error running command: {type(e).__name__}: {e}"
+
+
+# invoke runs the blocking version; ainvoke (what the async agents use) takes
+# the non-blocking one
+run_terminal_command = StructuredTool.from_function(
+    func=_run_terminal_command,
+    coroutine=_run_terminal_command_async,
+    name="run_terminal_command",
+)
+
+
@@ -1,16 +1,14 @@
 
 
+import asyncio
+import functools
 import json
 import re
 from typing import Any, Dict, Optional
-import sys
-from pathlib import Path
-
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.shared_memory import SharedMemory, FixPlan
 from core.message_logger import MessageLogger
+from core.json_extract import find_json_object
 
 
 
@@ -39,6 +37,12 @@ Your task:
 - Return one JSON object: description, steps[], safety_considerations[], expected_outcome."""
 
 
+@functools.lru_cache(maxsize=32)
+def _task_description(rca_context: str) -> str:
+    """The task prompt for an RCA; rebuilding the agent for it reuses the same string."""
+    return FIX_TASK_DESCRIPTION.format(rca_context=rca_context)
+
+
 def create_fix_agent(
     llm_service,
     logger: MessageLogger,
@@ -60,14 +64,13 @@ def create_fix_agent(
     from clap import Agent
     
     
-    rca_dict = shared_memory.get_rca_dict()
-    rca_context = json.dumps(rca_dict, indent=2) if rca_dict else "No RCA data available"
+    rca_context = shared_memory.get_rca_prompt_json() or "No RCA data available"
     
     
     agent = Agent(
         name="Fix_Suggestion_Agent",
         backstory=FIX_SYSTEM_PROMPT,
-        task_description=FIX_TASK_DESCRIPTION.format(rca_context=rca_context),
+        task_description=_task_description(rca_context),
         task_expected_output="A structured JSON fix plan with steps and safety considerations",
         llm_service=llm_service,
         model=model_name,
@@ -78,6 +81,12 @@ def create_fix_agent(
     return agent
 
 
+# Compiled once at import; parse_fix_output runs on every agent reply
+_DESCRIPTION_FIELD_RE = re.compile(r'(?:Description|description)[:\s]+(.+?)(?:\n|$)')
+
+_FIX_KEYS = ("description", "steps")
+
+
 def parse_fix_output(output: str) -> Optional[FixPlan]:
     """
     Parse the Fix agent's output to extract structured data.
@@ -89,43 +98,11 @@ def parse_fix_output(output: str) -> Optional[FixPlan]:
         FixPlan object if parsing succeeds, None otherwise
     """
     try:
-       
-        json_match = re.search(r'\{[^{}]*"description"[^{}]*\}', output, re.DOTALL)
-        if not json_match:
-            
-            json_match = re.search(r'\{[\s\S]*?"steps"[\s\S]*?\][\s\S]*?\}', output)
-        
-        if json_match:
-            json_str = json_match.group()
-            
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-                
-                start_idx = output.find('{"description"')
-                if start_idx == -1:
-                    start_idx = output.find('{\n    "description"')
-                if start_idx == -1:
-                    start_idx = output.find('{\n  "description"')
-                
-                if start_idx != -1:
-                    
-                    brace_count = 0
-                    end_idx = start_idx
-                    for i, char in enumerate(output[start_idx:], start_idx):
-                        if char == '{':
-                            brace_count += 1
-                        elif char == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                end_idx = i + 1
-                                break
-                    
-                    json_str = output[start_idx:end_idx]
-                    data = json.loads(json_str)
-                else:
-                    raise json.JSONDecodeError("No valid JSON found", output, 0)
-            
+        # One string-aware scan finds and decodes the plan object; no regex
+        # pre-pass whose match has to be decoded a second time
+        data = find_json_object(output, _FIX_KEYS) if "{" in output else None
+        
+        if data is not None:
             return FixPlan(
                 description=data.get("description", ""),
                 steps=data.get("steps", []),
@@ -134,7 +111,7 @@ def parse_fix_output(output: str) -> Optional[FixPlan]:
             )
         
        
-        description_match = re.search(r'(?:Description|description)[:\s]+(.+?)(?:\n|$)', output)
+        description_match = _DESCRIPTION_FIELD_RE.search(output)
         
         if description_match:
             return FixPlan(
@@ -151,6 +128,10 @@ def parse_fix_output(output: str) -> Optional[FixPlan]:
         return None
 
 
+# Fix plans longer than this are parsed in a worker thread, off the event loop
+_THREADED_PARSE_CHARS = 100_000
+
+
 async def run_fix_agent(
     llm_service,
     logger: MessageLogger,
@@ -194,7 +175,10 @@ async def run_fix_agent(
         output = result.get("output", "") if isinstance(result, dict) else str(result)
         
         
-        fix_plan = parse_fix_output(output)
+        if len(output) > _THREADED_PARSE_CHARS:
+            fix_plan = await asyncio.to_thread(parse_fix_output, output)
+        else:
+            fix_plan = parse_fix_output(output)
         
         if fix_plan:
          
@@ -203,7 +187,7 @@ async def run_fix_agent(
         
       
         logger.log_agent_end("Fix_Suggestion_Agent", {
-            "output": output[:500] + "..." if len(output) > 500 else output,
+            "output": output,
             "success": fix_plan is not None,
             "duration_ms": duration_ms
         })
@@ -1,19 +1,23 @@
 
 
+import asyncio
+import functools
 import json
-import re
 from typing import Any, Dict, Optional
-import sys
 from pathlib import Path
 
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from core.shared_memory import SharedMemory, PatchMetadata
 from core.message_logger import MessageLogger
+from core.json_extract import find_json_object
+from core.json_utils import loads
 from tools.file_tools import read_file, write_file
 from tools.terminal_tools import run_terminal_command
 
+try:
+    from json_repair import loads as repair_json_loads
+except ImportError:  # optional; without it malformed JSON goes straight to the regex fallback
+    repair_json_loads = None
+
 
 PATCH_SYSTEM_PROMPT = """You are an expert code-generation specialist focused on precise, minimal patches.
 
@@ -48,11 +52,32 @@ Your task:
 Write the ENTIRE corrected file content, not just a diff."""
 
 
+def get_patched_filename_hint(rca_dict: Optional[Dict[str, Any]]) -> str:
+    """Name the Patch agent is asked to write the fixed file under."""
+    affected_file = rca_dict.get("affected_file", "unknown") if rca_dict else "unknown"
+    if affected_file in ("", "unknown", None):
+        return "fixed_patch.py"
+    return f"fixed_{Path(affected_file).name}"
+
+
+@functools.lru_cache(maxsize=32)
+def _task_description(rca_context: str, fix_context: str, affected_file: str, affected_line: int) -> str:
+    """The task prompt for an RCA / fix plan; retries get the identical string back."""
+    return PATCH_TASK_DESCRIPTION.format(
+        rca_context=rca_context,
+        fix_context=fix_context,
+        affected_file=affected_file,
+        affected_line=affected_line,
+        patched_filename_hint=get_patched_filename_hint({"affected_file": affected_file})
+    )
+
+
 def create_patch_agent(
     llm_service,
     logger: MessageLogger,
     shared_memory: SharedMemory,
-    model_name: str = "gemini-2.0-flash"
+    model_name: str = "gemini-2.0-flash",
+    rca_dict: Optional[Dict[str, Any]] = None
 ):
     """
     Create and configure the Patch Generation Agent.
@@ -62,6 +87,7 @@ def create_patch_agent(
         logger: MessageLogger for capturing interactions
         shared_memory: SharedMemory to read RCA and fix plan from
         model_name: Name of the LLM model to use
+        rca_dict: The RCA, if the caller already has it; read from shared_memory otherwise
         
     Returns:
         Configured Agent instance
@@ -69,28 +95,21 @@ def create_patch_agent(
     from clap import Agent
     
   
-    rca_dict = shared_memory.get_rca_dict()
-    fix_dict = shared_memory.get_fix_plan_dict()
+    if rca_dict is None:
+        rca_dict = shared_memory.get_rca_dict()
     
-    rca_context = json.dumps(rca_dict, indent=2) if rca_dict else "No RCA data available"
-    fix_context = json.dumps(fix_dict, indent=2) if fix_dict else "No fix plan available"
+    rca_context = shared_memory.get_rca_prompt_json() or "No RCA data available"
+    fix_context = shared_memory.get_fix_plan_prompt_json() or "No fix plan available"
     
 
     affected_file = rca_dict.get("affected_file", "unknown") if rca_dict else "unknown"
     affected_line = rca_dict.get("affected_line", 0) if rca_dict else 0
-    patched_filename_hint = f"fixed_{Path(affected_file).name}" if affected_file not in ("", "unknown", None) else "fixed_patch.py"
     
    
     agent = Agent(
         name="Patch_Generation_Agent",
         backstory=PATCH_SYSTEM_PROMPT,
-        task_description=PATCH_TASK_DESCRIPTION.format(
-            rca_context=rca_context,
-            fix_context=fix_context,
-            affected_file=affected_file,
-            affected_line=affected_line,
-            patched_filename_hint=patched_filename_hint
-        ),
+        task_description=_task_description(rca_context, fix_context, affected_file, affected_line),
         task_expected_output="A complete patched file saved to outputs/ and patch metadata in JSON format",
         llm_service=llm_service,
         model=model_name,
@@ -101,64 +120,64 @@ def create_patch_agent(
     return agent
 
 
+# An object holding either of these is taken to be the patch metadata
+_PATCH_KEYS = ("original_file", "changes_made")
+
+
+def _is_patch_data(data: Any) -> bool:
+    return isinstance(data, dict) and any(key in data for key in _PATCH_KEYS)
+
+
 def parse_patch_output(output: str) -> Optional[PatchMetadata]:
     """
     Parse the Patch agent's output to extract structured metadata.
     
+    The output is tried as plain JSON first, then each balanced object in it
+    is tried in turn, and only then is it handed to json_repair (which
+    tolerates trailing commas and similar slips).
+    
     Args:
         output: Raw output string from the Patch agent
         
     Returns:
         PatchMetadata object if parsing succeeds, None otherwise
     """
+    # Patch metadata only ever comes as JSON
+    if "{" not in output:
+        return None
+    
     try:
-   
-        json_match = re.search(r'\{[^{}]*"original_file"[^{}]*\}', output, re.DOTALL)
-        if not json_match:
-          
-            json_match = re.search(r'\{[\s\S]*?"changes_made"[\s\S]*?\][\s\S]*?\}', output)
-        
-        if json_match:
-            json_str = json_match.group()
-            try:
-                data = json.loads(json_str)
-            except json.JSONDecodeError:
-              
-                start_idx = output.find('{"original_file"')
-                if start_idx == -1:
-                    start_idx = output.find('{\n    "original_file"')
-                
-                if start_idx != -1:
-                    brace_count = 0
-                    end_idx = start_idx
-                    for i, char in enumerate(output[start_idx:], start_idx):
-                        if char == '{':
-                            brace_count += 1
-                        elif char == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                end_idx = i + 1
-                                break
-                    
-                    json_str = output[start_idx:end_idx]
-                    data = json.loads(json_str)
-                else:
-                    raise json.JSONDecodeError("No valid JSON found", output, 0)
-            
-            return PatchMetadata(
-                original_file=data.get("original_file", ""),
-                patched_file=data.get("patched_file", ""),
-                changes_made=data.get("changes_made", []),
-                lines_modified=data.get("lines_modified", [])
-            )
+        data = None
+        try:
+            data = loads(output)
+        except json.JSONDecodeError:
+            pass
         
-        return None
+        if not _is_patch_data(data):
+            data = find_json_object(output, _PATCH_KEYS)
+        
+        if data is None and repair_json_loads is not None:
+            data = repair_json_loads(output)
+        
+        if not _is_patch_data(data):
+            return None
+        
+        return PatchMetadata(
+            original_file=data.get("original_file", ""),
+            patched_file=data.get("patched_file", ""),
+            changes_made=data.get("changes_made", []),
+            lines_modified=data.get("lines_modified", [])
+        )
         
     except (json.JSONDecodeError, ValueError, TypeError) as e:
         print(f"Error parsing Patch output: {e}")
         return None
 
 
+# Patch replies above this size (in characters) are parsed via asyncio.to_thread
+_THREADED_PARSE_CHARS = 100_000
+
+
 async def run_patch_agent(
     llm_service,
     logger: MessageLogger,
@@ -192,7 +211,10 @@ async def run_patch_agent(
     
     try:
        
-        agent = create_patch_agent(llm_service, logger, shared_memory, model_name)
+        agent = create_patch_agent(
+            llm_service, logger, shared_memory, model_name,
+            rca_dict=patch_context.get("rca")
+        )
         
         import time
         start_time = time.time()
@@ -205,7 +227,10 @@ async def run_patch_agent(
         output = result.get("output", "") if isinstance(result, dict) else str(result)
         
        
-        patch_metadata = parse_patch_output(output)
+        if len(output) > _THREADED_PARSE_CHARS:
+            patch_metadata = await asyncio.to_thread(parse_patch_output, output)
+        else:
+            patch_metadata = parse_patch_output(output)
         
         if patch_metadata:
          
@@ -214,7 +239,7 @@ async def run_patch_agent(
         
      
         logger.log_agent_end("Patch_Generation_Agent", {
-            "output": output[:500] + "..." if len(output) > 500 else output,
+            "output": output,
             "success": patch_metadata is not None,
             "duration_ms": duration_ms
         })
@@ -10,17 +10,15 @@ This agent is responsible for:
 The agent uses tools to parse error traces and read source files.
 """
 
+import asyncio
 import json
+import math
 import re
 from typing import Any, Dict, List, Optional
-import sys
-from pathlib import Path
-
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.shared_memory import SharedMemory, RCAResult
 from core.message_logger import MessageLogger
+from core.json_extract import find_json_object
 from tools.file_tools import read_file, list_directory
 from tools.analysis_tools import parse_error_trace
 
@@ -78,30 +76,53 @@ def create_rca_agent(
     return agent
 
 
+# An object holding either of these is taken to be the RCA report
+_RCA_KEYS = ("error_type", "evidence")
+
+# Plain-text fallbacks, compiled once at import
+_ERROR_TYPE_FIELD_RE = re.compile(r'(?:Error Type|error_type)[:\s]+([A-Za-z]+Error)')
+_ERROR_MSG_FIELD_RE = re.compile(r'(?:Error Message|error_message)[:\s]+(.+?)(?:\n|$)')
+
+_INT_RE = re.compile(r'-?\d+')
+
+
+def _coerce_int(value: Any) -> int:
+    """Line number from whatever the LLM wrote ("42", "line 42", 42.0, null...); 0 if none."""
+    # bool is an int subclass, but true/false is not a line number
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if math.isfinite(value) else 0
+    if isinstance(value, str):
+        match = _INT_RE.search(value)
+        return int(match.group()) if match else 0
+    return 0
+
+
 def parse_rca_output(output: str) -> Optional[RCAResult]:
  
     try:
-        json_match = re.search(r'\{[^{}]*"error_type"[^{}]*\}', output, re.DOTALL)
-        if not json_match:
-            json_match = re.search(r'\{[\s\S]*?"evidence"[\s\S]*?\][\s\S]*?\}', output)
+        data = find_json_object(output, _RCA_KEYS) if "{" in output else None
         
-        if json_match:
-            json_str = json_match.group()
-            data = json.loads(json_str)
-            
+        if data is not None:
             return RCAResult(
                 error_type=data.get("error_type", ""),
                 error_message=data.get("error_message", ""),
                 root_cause=data.get("root_cause", ""),
                 affected_file=data.get("affected_file", ""),
-                affected_line=int(data.get("affected_line", 0)),
+                affected_line=_coerce_int(data.get("affected_line")),
                 affected_function=data.get("affected_function", ""),
                 evidence=data.get("evidence", [])
             )
         
-      
-        error_type_match = re.search(r'(?:Error Type|error_type)[:\s]+([A-Za-z]+Error)', output)
-        error_msg_match = re.search(r'(?:Error Message|error_message)[:\s]+(.+?)(?:\n|$)', output)
+        # The plain-text fallback needs an "...Error" type name to match
+        if "Error" not in output:
+            return None
+        
+        error_type_match = _ERROR_TYPE_FIELD_RE.search(output)
+        error_msg_match = _ERROR_MSG_FIELD_RE.search(output)
         
         if error_type_match:
             return RCAResult(
@@ -121,6 +142,10 @@ def parse_rca_output(output: str) -> Optional[RCAResult]:
         return None
 
 
+# Replies longer than this are parsed in a worker thread
+_THREADED_PARSE_CHARS = 100_000
+
+
 async def run_rca_agent(
     llm_service,
     logger: MessageLogger,
@@ -150,7 +175,10 @@ async def run_rca_agent(
         output = result.get("output", "") if isinstance(result, dict) else str(result)
         
   
-        rca_result = parse_rca_output(output)
+        if len(output) > _THREADED_PARSE_CHARS:
+            rca_result = await asyncio.to_thread(parse_rca_output, output)
+        else:
+            rca_result = parse_rca_output(output)
         
         if rca_result:
        
@@ -159,7 +187,7 @@ async def run_rca_agent(
         
       
         logger.log_agent_end("RCA_Agent", {
-            "output": output[:500] + "..." if len(output) > 500 else output,
+            "output": output,
             "success": rca_result is not None,
             "duration_ms": duration_ms
         })
@@ -2,31 +2,50 @@
 Configuration for the Multi-Agent RCA System.
 """
 
+import functools
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+from typing import Dict, Optional
 
 # Base paths
 BASE_DIR = Path(__file__).parent
 PROJECT_ROOT = BASE_DIR.parent
 
-# API Configuration
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-# LLM Configuration
-# Set LLM_PROVIDER to "google", "groq", or "auto" (auto tries google first, then groq)
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "auto").lower()
+@functools.cache
+def load_env() -> None:
+    """Load .env into os.environ, once, the first time a setting needs it."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+@functools.cache
+def _env_settings() -> Dict[str, Optional[str]]:
+    load_env()
+    
+    # Set LLM_PROVIDER to "google", "groq", or "auto" (auto tries google first, then groq)
+    provider = os.getenv("LLM_PROVIDER", "auto").lower()
+    google_model = os.getenv("GOOGLE_MODEL", "gemini-2.5-flash")
+    groq_model = os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905")
+    
+    return {
+        "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY"),
+        "GROQ_API_KEY": os.getenv("GROQ_API_KEY"),
+        "LLM_PROVIDER": provider,
+        "GOOGLE_MODEL": google_model,
+        "GROQ_MODEL": groq_model,
+        "LLM_MODEL": google_model if provider == "google" else groq_model,
+    }
+
 
-# Model names for each provider
-GOOGLE_MODEL = os.getenv("GOOGLE_MODEL", "gemini-2.5-flash")
-GROQ_MODEL = os.getenv("GROQ_MODEL", "moonshotai/kimi-k2-instruct-0905")
+def __getattr__(name: str):
+    # API keys and LLM settings are read from the environment (and .env) on
+    # first access, and only once per process
+    settings = _env_settings()
+    if name in settings:
+        return settings[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# LLM_MODEL will be set based on provider selection
-LLM_MODEL = GOOGLE_MODEL if LLM_PROVIDER == "google" else GROQ_MODEL
 
 # Path Configuration
 CODEBASE_PATH = PROJECT_ROOT / "fastapi-project"
@@ -46,8 +65,9 @@ LOG_LEVEL = "INFO"
 def validate_config():
     """Validate that required configuration is present."""
     errors = []
+    settings = _env_settings()
     
-    if not GOOGLE_API_KEY and not GROQ_API_KEY:
+    if not settings["GOOGLE_API_KEY"] and not settings["GROQ_API_KEY"]:
         errors.append("Either GOOGLE_API_KEY or GROQ_API_KEY must be set in environment")
     
     if not CODEBASE_PATH.exists():
@@ -0,0 +1,60 @@
+
+
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from .json_utils import loads
+
+
+def iter_balanced_json(text: str, start: int = 0) -> Iterator[str]:
+    """
+    Yield each top-level ``{...}`` span in ``text``, left to right.
+
+    One pass over the text, tracking brace depth plus string and escape
+    state, so braces inside JSON string values do not end an object early.
+    Quotes in the prose between objects are ignored.
+    """
+    depth = 0
+    in_string = False
+    escape = False
+    obj_start = -1
+
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == "{":
+            if depth == 0:
+                obj_start = i
+            depth += 1
+        elif depth == 0:
+            continue
+        elif char == '"':
+            in_string = True
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                yield text[obj_start:i + 1]
+
+
+def find_balanced_json(text: str, start: int = 0) -> Optional[str]:
+    """The first balanced ``{...}`` span at or after ``start``, or None."""
+    return next(iter_balanced_json(text, start), None)
+
+
+def find_json_object(text: str, keys: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """First balanced span in ``text`` that decodes to a dict holding any of ``keys``."""
+    keys = tuple(keys)
+    for candidate in iter_balanced_json(text):
+        try:
+            data = loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict) and any(key in data for key in keys):
+            return data
+    return None
@@ -1,5 +1,4 @@
 
-import json
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -8,6 +7,8 @@ from dataclasses import dataclass, field, asdict
 from enum import Enum
 import threading
 
+from .json_utils import dumps
+
 
 class EventType(str, Enum):
     """Types of events that can be logged."""
@@ -98,13 +99,16 @@ class MessageLogger:
                 iteration=iteration
             )
     
-    def log_agent_end(self, agent_name: str, result: Dict[str, Any]) -> None:
-       
+    def log_agent_end(self, agent_name: str, result: Dict[str, Any], max_output_len: Optional[int] = 500) -> None:
+        """Log an agent finishing; its output is cut to ``max_output_len`` chars (None keeps it whole)."""
+        output = result.get("output", "")
+        if max_output_len is not None and len(output) > max_output_len:
+            output = output[:max_output_len] + "..."
         self.log_event(
             agent_name=agent_name,
             event_type=EventType.AGENT_END,
             data={
-                "output": result.get("output", ""),
+                "output": output,
                 "success": result.get("success", True),
                 "duration_ms": result.get("duration_ms", 0)
             }
@@ -256,8 +260,7 @@ class MessageLogger:
         with self._lock:
             path = Path(filepath)
             path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self.get_full_log(), f, indent=2, ensure_ascii=False)
+            path.write_bytes(dumps(self.get_full_log(), indent=True))
     
     def __repr__(self) -> str:
         return f"MessageLogger(session={self._session_id}, events={len(self._events)})"
@@ -1,12 +1,13 @@
 
 
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 from dataclasses import dataclass, field, asdict
 import threading
 
+from .json_utils import dumps, loads
+
 
 @dataclass
 class RCAResult:
@@ -78,6 +79,10 @@ class SharedMemory:
                 "version": "1.0"
             }
         }
+        # Compact JSON for agent prompts (indentation only costs tokens),
+        # rebuilt only when the section changes
+        self._rca_json_cache: Optional[str] = None
+        self._fix_plan_json_cache: Optional[str] = None
     
     def _update_timestamp(self):
         
@@ -89,6 +94,7 @@ class SharedMemory:
         with self._lock:
             rca.timestamp = datetime.utcnow().isoformat()
             self._state["rca"] = rca.to_dict()
+            self._rca_json_cache = None
             self._update_timestamp()
     
     def get_rca(self) -> Optional[RCAResult]:
@@ -103,12 +109,20 @@ class SharedMemory:
         with self._lock:
             return self._state.get("rca")
     
+    def get_rca_prompt_json(self) -> Optional[str]:
+        """RCA as compact JSON for prompts, or None if no RCA is set."""
+        with self._lock:
+            if self._rca_json_cache is None and self._state.get("rca"):
+                self._rca_json_cache = dumps(self._state["rca"]).decode("utf-8")
+            return self._rca_json_cache
+    
    
     def set_fix_plan(self, fix_plan: FixPlan) -> None:
      
         with self._lock:
             fix_plan.timestamp = datetime.utcnow().isoformat()
             self._state["fix_plan"] = fix_plan.to_dict()
+            self._fix_plan_json_cache = None
             self._update_timestamp()
     
     def get_fix_plan(self) -> Optional[FixPlan]:
@@ -123,6 +137,13 @@ class SharedMemory:
         with self._lock:
             return self._state.get("fix_plan")
     
+    def get_fix_plan_prompt_json(self) -> Optional[str]:
+        """Fix plan as compact JSON for prompts, or None if no plan is set."""
+        with self._lock:
+            if self._fix_plan_json_cache is None and self._state.get("fix_plan"):
+                self._fix_plan_json_cache = dumps(self._state["fix_plan"]).decode("utf-8")
+            return self._fix_plan_json_cache
+    
  
     def set_patch_metadata(self, patch: PatchMetadata) -> None:
      
@@ -147,7 +168,7 @@ class SharedMemory:
     def get_full_state(self) -> Dict[str, Any]:
       
         with self._lock:
-            return json.loads(json.dumps(self._state))  # Deep copy
+            return loads(dumps(self._state))  # Deep copy
     
     def get_context_for_agent(self, agent_name: str) -> Dict[str, Any]:
      
@@ -167,16 +188,16 @@ class SharedMemory:
         with self._lock:
             path = Path(filepath)
             path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self._state, f, indent=2, ensure_ascii=False)
+            path.write_bytes(dumps(self._state, indent=True))
     
     def load(self, filepath: str) -> None:
      
         with self._lock:
             path = Path(filepath)
             if path.exists():
-                with open(path, "r", encoding="utf-8") as f:
-                    self._state = json.load(f)
+                self._state = loads(path.read_bytes())
+                self._rca_json_cache = None
+                self._fix_plan_json_cache = None
     
     def __repr__(self) -> str:
         return f"SharedMemory(rca={'set' if self._state['rca'] else 'empty'}, fix_plan={'set' if self._state['fix_plan'] else 'empty'}, patch={'set' if self._state['patch_metadata'] else 'empty'})"
@@ -26,7 +26,7 @@ from core.shared_memory import SharedMemory
 from core.message_logger import MessageLogger
 from agents.rca_agent import run_rca_agent
 from agents.fix_agent import run_fix_agent
-from agents.patch_agent import run_patch_agent
+from agents.patch_agent import get_patched_filename_hint, run_patch_agent
 
 
 def get_llm_service():
@@ -197,13 +197,15 @@ async def run_rca_pipeline(
         
       
         shared_memory_path = output_path / "shared_memory.json"
-        shared_memory.save(str(shared_memory_path))
-        print(f"Shared Memory saved to: {shared_memory_path}")
-        
-      
         message_history_path = output_path / "message_history.json"
         logger.log_system("Pipeline completed", {"success": results["success"]})
-        logger.save(str(message_history_path))
+        
+        # The two files are independent; write them side by side off the loop
+        await asyncio.gather(
+            asyncio.to_thread(shared_memory.save, str(shared_memory_path)),
+            asyncio.to_thread(logger.save, str(message_history_path)),
+        )
+        print(f"Shared Memory saved to: {shared_memory_path}")
         print(f"Message History saved to: {message_history_path}")
         
     
@@ -214,9 +216,11 @@ async def run_rca_pipeline(
             if not patch_file.is_absolute():
                 patch_file = output_path / patch_file
         else:
-            candidates = list(output_path.glob("fixed_*"))
-            if candidates:
-                patch_file = candidates[0]
+            # No metadata: look where the agent was told to write first, and
+            # only scan the output directory if it wrote somewhere else
+            patch_file = output_path / get_patched_filename_hint(shared_memory.get_rca_dict())
+            if not patch_file.exists():
+                patch_file = next(output_path.glob("fixed_*"), None)
 
         if patch_file and patch_file.exists():
             print(f"Patch File created: {patch_file}")
@@ -7,12 +7,9 @@ Provides tools for parsing and analyzing error traces and logs.
 import json
 from pathlib import Path
 from typing import Any, Dict, List, Optional
-import sys
-
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import ERROR_TRACE_PATH
+from core.json_utils import loads
 
 
 from clap import tool
@@ -29,7 +26,7 @@ def _extract_stack_frames(stack_details: str) -> List[Dict[str, Any]]:
         List of parsed stack frames
     """
     try:
-        frames = json.loads(stack_details)
+        frames = loads(stack_details)
         return frames if isinstance(frames, list) else []
     except (json.JSONDecodeError, TypeError):
         return []
@@ -103,8 +100,7 @@ def parse_error_trace(trace_path: str) -> str:
             return f"Error: Trace file not found at {path}"
         
         # Read and parse JSON
-        with open(path, "r", encoding="utf-8") as f:
-            trace_data = json.load(f)
+        trace_data = loads(path.read_bytes())
         
         # Handle both single object and array formats
         if isinstance(trace_data, list):
@@ -3,10 +3,6 @@
 import os
 from pathlib import Path
 from typing import Optional
-import sys
-
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import MAX_FILE_SIZE_BYTES, ALLOWED_READ_EXTENSIONS, OUTPUT_DIR, CODEBASE_PATH
 
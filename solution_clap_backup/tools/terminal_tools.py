@@ -2,11 +2,6 @@
 
 import os
 import subprocess
-from pathlib import Path
-import sys
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import PROJECT_ROOT
 from clap import tool